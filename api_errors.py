@@ -0,0 +1,30 @@
+from typing import NamedTuple, Optional
+
+
+# Failure kinds carried by APIError
+HTTP_ERROR = 'http'
+TIMEOUT = 'timeout'
+CONNECTION = 'connection'
+RATE_LIMITED = 'rate_limited'
+CIRCUIT_OPEN = 'circuit_open'
+CANCELLED = 'cancelled'
+
+# Statuses worth retrying: the same request may well succeed a moment later
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+
+class APIError(NamedTuple):
+    """Why a Riot request returned no data, instead of a printed message"""
+    url: str
+    kind: str
+    status: Optional[int] = None
+    message: str = ''
+    attempts: int = 1
+
+    @property
+    def transient(self) -> bool:
+        return self.kind in (TIMEOUT, CONNECTION, RATE_LIMITED) or self.status in RETRYABLE_STATUSES
+
+    def __str__(self) -> str:
+        status = f" {self.status}" if self.status else ''
+        return f"{self.kind}{status} after {self.attempts} attempt(s): {self.url} {self.message}".rstrip()
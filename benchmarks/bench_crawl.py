@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: live-crawl throughput of RiotAPIClient.analyze_champion_builds
+against the local Riot API stand-in (riot_stub_server.py), with no key or network.
+
+Usage: python benchmarks/bench_crawl.py [--champion Ahri] [--games 30] [--workers 8]
+                                        [--latency-ms 40] [--rate-limits 100:1]
+                                        [--record CASSETTE | --replay CASSETTE]
+                                        [--metrics FILE.json|FILE.prom]
+
+Every run starts from an empty cache, so the league lists and each match are
+really requested. --record saves all responses to a cassette;
+--replay answers from one instead of the stand-in server. --metrics dumps the
+run's latency histograms, statuses, rate-limit waits and cache counters.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from metrics import metrics
+from http_session import create_recording_session, create_replay_session, create_session, save_cassette
+from rate_limiter import parse_rate_limits
+from request_cache import SingleFlight
+from request_scheduler import RequestScheduler
+from riot_api_client import RiotAPIClient
+from riot_stub_server import RiotStubServer
+
+# Cassettes keep the stand-in's address, so replays always use this port
+STUB_PORT = 8089
+
+
+def run_crawl(args, session, base_url: str):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = RiotAPIClient(api_key='RGAPI-bench', cache_dir=cache_dir, session=session,
+                               max_workers=args.workers, scheduler=RequestScheduler(),
+                               in_flight=SingleFlight())
+        client.BASE_URLS = {region: base_url for region in RiotAPIClient.BASE_URLS}
+        client.REGIONAL_URLS = {route: base_url for route in RiotAPIClient.REGIONAL_URLS}
+
+        start = time.perf_counter()
+        crawl = client._crawl_builds([(args.champion, None)], args.games)
+        elapsed = time.perf_counter() - start
+
+    if crawl is None:
+        print("❌ Crawl returned nothing (stand-in found no league lists in cache/?)")
+        return None
+    builds, players_checked, matches_scanned = crawl
+    return elapsed, builds[(args.champion, None)]['total_games'], players_checked, matches_scanned, client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--champion', default='Ahri')
+    parser.add_argument('--games', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=40)
+    parser.add_argument('--rate-limits', default='100:1')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--record', metavar='CASSETTE')
+    mode.add_argument('--replay', metavar='CASSETTE')
+    parser.add_argument('--metrics', metavar='FILE')
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{STUB_PORT}"
+    server = None
+    if args.replay:
+        session = create_replay_session(args.replay)
+        print(f"⏯️  Replaying {args.replay}")
+    else:
+        server = RiotStubServer(ROOT / 'cache', STUB_PORT, rate_limits=parse_rate_limits(args.rate_limits),
+                                latency=args.latency_ms / 1000, seed=0).start()
+        session = create_recording_session() if args.record else create_session()
+        print(f"🧪 Stand-in server: {args.latency_ms:.0f} ms latency, limits {args.rate_limits or 'none'}")
+
+    try:
+        result = run_crawl(args, session, base_url)
+    finally:
+        if server:
+            server.stop()
+
+    if result is None:
+        sys.exit(1)
+    elapsed, games, players_checked, matches_scanned, client = result
+
+    print(f"\n{'champion':<12}{'games':>8}{'players':>10}{'matches':>10}{'time (s)':>10}{'matches/s':>11}")
+    print(f"{args.champion:<12}{games:>8}{players_checked:>10}{matches_scanned:>10}"
+          f"{elapsed:>10.2f}{matches_scanned / elapsed:>11.1f}")
+    if server:
+        print(f"\n   Server: {server.requests} requests, statuses {dict(server.status_counts)}")
+    stats = client.scheduler.stats()['background']
+    print(f"   Scheduler: {stats['granted']} grants, avg wait {stats['avg_wait'] * 1000:.1f} ms, "
+          f"max wait {stats['max_wait'] * 1000:.0f} ms")
+
+    if args.record:
+        recorded = save_cassette(session, args.record)
+        print(f"   💾 Recorded {recorded} requests to {args.record}")
+    if args.metrics:
+        metrics.dump(args.metrics)
+        print(f"   📈 Metrics written to {args.metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request latency of module-level requests.get vs the shared
+pooled session from http_session.py, against a local stand-in HTTP server.
+
+Usage: python benchmarks/bench_http_session.py [--requests 300] [--handshake-ms 0]
+
+--handshake-ms delays every new connection to stand in for the TCP+TLS
+handshake cost of a real Riot host (loopback has neither RTT nor TLS).
+"""
+
+import argparse
+import gzip
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import requests
+from http_session import create_session
+
+
+def load_payload() -> bytes:
+    # A real cached match is the typical response body of a crawl
+    matches = sorted((ROOT / 'cache').glob('match_*.json'))
+    if matches:
+        return matches[0].read_bytes()
+    return b'{"metadata": {}, "info": {"participants": []}}'
+
+
+def start_server(payload: bytes, handshake_ms: float = 0) -> ThreadingHTTPServer:
+    compressed = gzip.compress(payload)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive unless the client closes
+        disable_nagle_algorithm = True  # headers and body are separate writes
+
+        def setup(self):
+            super().setup()
+            if handshake_ms:
+                time.sleep(handshake_ms / 1000)
+
+        def do_GET(self):
+            use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+            body = compressed if use_gzip else payload
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_requests(get, url: str, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        response = get(url, timeout=10)
+        response.json()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--handshake-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    payload = load_payload()
+    server = start_server(payload, args.handshake_ms)
+    url = f"http://127.0.0.1:{server.server_port}/lol/match/v5/matches/EUW1_0"
+
+    session = create_session()
+    # Warm up both paths so imports and the first connection are not counted
+    requests.get(url, timeout=10)
+    session.get(url, timeout=10)
+
+    per_call = time_requests(requests.get, url, args.requests)
+    pooled = time_requests(session.get, url, args.requests)
+    server.shutdown()
+
+    print("=" * 60)
+    print("🌐 HTTP SESSION BENCHMARK")
+    print("=" * 60)
+    print(f"  Payload: {len(payload) / 1024:.0f} KB JSON, {args.requests} requests each")
+    print(f"  Simulated handshake: {args.handshake_ms:.0f} ms per new connection")
+    print(f"  requests.get (new connection): {per_call:.2f} ms/request")
+    print(f"  pooled keep-alive session:     {pooled:.2f} ms/request")
+    print(f"  Saved: {per_call - pooled:.2f} ms/request ({(1 - pooled / per_call) * 100:.0f}%)")
+    if not args.handshake_ms:
+        print("  Note: loopback has no RTT or TLS; try --handshake-ms 30 for a real host")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the build pipeline's hot paths, run on the committed cache/ corpus.
+
+Times cold (empty cache, served by a local stand-in) and warm DataDragonClient
+loads, BuildGenerator.__init__ and _process_items, generate_build for each
+source (expert fallback, match cache, Riot API via riot_stub_server.py), and
+match parsing and aggregation. No key or network needed.
+
+Usage: python benchmarks/bench_pipeline.py [--repeat 5] [--only NAME ...]
+                                           [--baseline FILE] [--save-baseline]
+                                           [--threshold 0.2] [--metrics FILE.json|FILE.prom]
+
+Results (median and min per benchmark) are written to benchmarks/results/latest.json.
+With a baseline (default benchmarks/results/baseline.json) every median is
+compared against it, and the run exits with status 1 if any is slower by more
+than --threshold (20% by default). --save-baseline stores this run as the baseline.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cache_codec import read_json
+from build_index import BuildIndex, index_match_files
+from build_generator import BuildGenerator
+from data_dragon_client import DataDragonClient
+from riot_api_client import RiotAPIClient
+from riot_stub_server import RiotStubServer
+from metrics import metrics
+
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+STATIC_DIR = ROOT / 'cache' / 'ddragon'
+VERSION = read_json(STATIC_DIR / 'current.json')['version']
+CHAMPION = 'Ahri'
+ROLE = 'MIDDLE'
+
+BENCHMARKS = [
+    'ddragon_cold', 'ddragon_warm', 'build_generator_init', 'process_items',
+    'generate_build_fallback', 'generate_build_match_cache', 'generate_build_riot_api',
+    'parse_aggregate_corpus', 'analyze_offline',
+]
+
+def champion_full() -> Dict:
+    """championFull.json rebuilt from the committed per-champion files (a subset of the roster)"""
+    data = {}
+    for path in sorted((STATIC_DIR / VERSION).glob('champion_*.json')):
+        data.update(read_json(path)['data'])
+    return {'type': 'champion', 'format': 'full', 'version': VERSION, 'data': data}
+
+
+DDRAGON_ROUTES = [
+    (re.compile(r'^/api/versions\.json$'), lambda m: [VERSION]),
+    (re.compile(r'/data/en_US/championFull\.json$'), lambda m: champion_full()),
+    (re.compile(r'/data/en_US/champion\.json$'), lambda m: read_json(STATIC_DIR / VERSION / 'champions.json')),
+    (re.compile(r'/data/en_US/champion/(\w+)\.json$'),
+     lambda m: read_json(STATIC_DIR / VERSION / f'champion_{m.group(1)}.json')),
+    (re.compile(r'/data/en_US/item\.json$'), lambda m: read_json(STATIC_DIR / VERSION / 'items.json')),
+    (re.compile(r'/data/en_US/runesReforged\.json$'), lambda m: read_json(STATIC_DIR / VERSION / 'runes.json')),
+]
+
+
+def start_ddragon_server() -> ThreadingHTTPServer:
+    """Serves the committed static files under Data Dragon's URL layout"""
+    bodies = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            body = bodies.get(self.path)
+            if body is None:
+                for pattern, load in DDRAGON_ROUTES:
+                    match = pattern.search(self.path)
+                    if match:
+                        body = bodies[self.path] = json.dumps(load(match)).encode('utf-8')
+                        break
+            status = 200 if body is not None else 404
+            body = body or b'{}'
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def working_dir(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def copy_static(cache_dir: Path, league_lists: bool = False):
+    (cache_dir / 'ddragon').mkdir(parents=True, exist_ok=True)
+    shutil.copy(STATIC_DIR / 'current.json', cache_dir / 'ddragon')
+    shutil.copytree(STATIC_DIR / VERSION, cache_dir / 'ddragon' / VERSION)
+    if league_lists:
+        for pattern in ('challenger_*.json', 'master_*.json'):
+            for path in (ROOT / 'cache').glob(pattern):
+                shutil.copy(path, cache_dir)
+
+
+class Suite:
+    """Each benchmark returns the seconds its timed section took for one run"""
+
+    def __init__(self):
+        # Time the cached patch only; no background versions.json checks against the real CDN
+        DataDragonClient.UPDATE_CHECK_INTERVAL = None
+        self.ddragon_server = start_ddragon_server()
+        # Same client, pointed at the local stand-in instead of ddragon.leagueoflegends.com
+        self.local_ddragon = type('LocalDataDragonClient', (DataDragonClient,), {
+            'BASE_URL': f"http://127.0.0.1:{self.ddragon_server.server_port}"
+        })
+        self.riot_server = RiotStubServer(ROOT / 'cache', rate_limits=[(1000, 1)]).start()
+        self.riot_server.player_matches()  # index the corpus once, outside the timed runs
+        self.match_files = [str(path) for path in sorted((ROOT / 'cache').glob('match_*.json'))]
+        with working_dir(ROOT), quiet():
+            self.generator = BuildGenerator()
+            # The offline benchmarks measure a warm index, not its first build
+            BuildIndex(ROOT / 'cache').refresh()
+
+    def close(self):
+        self.ddragon_server.shutdown()
+        self.riot_server.stop()
+
+    def ddragon_cold(self) -> float:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            client = self.local_ddragon(cache_dir=tmp)
+            client.get_champions()
+            client.get_items()
+            client.get_runes()
+            client.get_champion_details(CHAMPION)
+            return time.perf_counter() - start
+
+    def ddragon_warm(self) -> float:
+        start = time.perf_counter()
+        client = DataDragonClient(cache_dir=str(ROOT / 'cache'))
+        client.get_champions()
+        client.get_items()
+        client.get_runes()
+        client.get_champion_details(CHAMPION)
+        return time.perf_counter() - start
+
+    def build_generator_init(self) -> float:
+        with working_dir(ROOT):
+            start = time.perf_counter()
+            BuildGenerator()
+            return time.perf_counter() - start
+
+    def process_items(self) -> float:
+        start = time.perf_counter()
+        self.generator._process_items()
+        return time.perf_counter() - start
+
+    def generate_build_fallback(self) -> float:
+        with working_dir(ROOT), quiet():
+            start = time.perf_counter()
+            self.generator.generate_build(CHAMPION, 'mid')
+            return time.perf_counter() - start
+
+    def generate_build_match_cache(self) -> float:
+        with working_dir(ROOT), quiet():
+            start = time.perf_counter()
+            self.generator.generate_build(CHAMPION, ROLE, offline=True)
+            return time.perf_counter() - start
+
+    def generate_build_riot_api(self) -> float:
+        """Live lookup from an empty match cache against the local stand-in (no latency)"""
+        server = self.riot_server
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            copy_static(tmp / 'cache', league_lists=True)
+            (tmp / 'riot_api_key.txt').write_text('RGAPI-bench')
+            urls = RiotAPIClient.BASE_URLS, RiotAPIClient.REGIONAL_URLS
+            RiotAPIClient.BASE_URLS = {region: server.url for region in urls[0]}
+            RiotAPIClient.REGIONAL_URLS = {route: server.url for route in urls[1]}
+            try:
+                with working_dir(tmp), quiet():
+                    generator = BuildGenerator()
+                    start = time.perf_counter()
+                    build = generator.generate_build(CHAMPION, ROLE, use_api=True)
+                    elapsed = time.perf_counter() - start
+            finally:
+                RiotAPIClient.BASE_URLS, RiotAPIClient.REGIONAL_URLS = urls
+            if build.get('source') != 'riot_api':
+                raise RuntimeError(f"expected an API build, got source={build.get('source')}")
+            return elapsed
+
+    def parse_aggregate_corpus(self) -> float:
+        """Read and count every cached match in one process (the cold index build)"""
+        start = time.perf_counter()
+        index_match_files(self.match_files)
+        return time.perf_counter() - start
+
+    def analyze_offline(self) -> float:
+        client = RiotAPIClient(api_key=None, cache_dir=str(ROOT / 'cache'))
+        with quiet():
+            start = time.perf_counter()
+            client.analyze_champion_builds(CHAMPION, ROLE, offline=True)
+            return time.perf_counter() - start
+
+    def benchmarks(self) -> Dict[str, Callable[[], float]]:
+        return {name: getattr(self, name) for name in BENCHMARKS}
+
+
+def run(names: List[str], repeat: int) -> Dict:
+    suite = Suite()
+    benchmarks = suite.benchmarks()
+    results = {}
+    try:
+        for name in names:
+            bench = benchmarks[name]
+            bench()  # warm-up: imports, first connection, page cache
+            samples = [bench() for _ in range(repeat)]
+            results[name] = {
+                'median_ms': statistics.median(samples) * 1000,
+                'min_ms': min(samples) * 1000,
+                'repeat': repeat
+            }
+            print(f"  {name:<28}{results[name]['median_ms']:>10.2f} ms  (min {results[name]['min_ms']:.2f})")
+    finally:
+        suite.close()
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    print(f"\n  {'benchmark':<28}{'baseline':>10}{'now':>10}{'change':>9}")
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            print(f"  {name:<28}{'-':>10}{result['median_ms']:>10.2f}{'new':>9}")
+            continue
+        change = result['median_ms'] / before['median_ms'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  ❌ regression'
+        print(f"  {name:<28}{before['median_ms']:>10.2f}{result['median_ms']:>10.2f}{change * 100:>8.0f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument('--baseline', default=str(RESULTS_DIR / 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--metrics', metavar='FILE', help='also dump the metrics registry (.json or .prom)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⏱️  BUILD PIPELINE BENCHMARKS")
+    print("=" * 60)
+    print(f"  Corpus: {len(list((ROOT / 'cache').glob('match_*.json')))} cached matches, "
+          f"median of {args.repeat} runs\n")
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': run(args.only, args.repeat)
+    }
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    with open(RESULTS_DIR / 'latest.json', 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n  💾 Results written to {RESULTS_DIR / 'latest.json'}")
+    if args.metrics:
+        metrics.dump(args.metrics)
+        print(f"  📈 Metrics written to {args.metrics}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"  💾 Saved as baseline: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("  No baseline yet; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n✅ No regressions over {args.threshold * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,39 @@
 from typing import Dict, List, Optional
 from data_dragon_client import DataDragonClient
+from metrics import metrics
+from static_snapshot import load_snapshot, save_snapshot
 import os
 
 
 class BuildGenerator:
     
-    def __init__(self):
-        self.ddragon = DataDragonClient()
+    def __init__(self, regions: List[str] = None):
+        # Platforms crawled for live builds; more than one crawls them in parallel
+        self.regions = regions or ['euw1']
+        with metrics.timer(phase='static_data_load'):
+            self.ddragon = DataDragonClient()
+            # Per-patch snapshot of the parsed and processed static data; rebuilt when the version changes
+            snapshot = load_snapshot(self.ddragon.cache_dir, self.ddragon.version)
+            if snapshot is None:
+                snapshot = self._build_snapshot()
+                save_snapshot(self.ddragon.cache_dir, snapshot)
+            self.items_data = snapshot['items_data']
+            self.runes_data = snapshot['runes_data']
+            self.champions_data = snapshot['champions_data']
+            self.items = snapshot['items']
+
+    def _build_snapshot(self) -> Dict:
         self.items_data = self.ddragon.get_items()
-        self.runes_data = self.ddragon.get_runes()
-        self._process_items()
-        
+        with metrics.timer(phase='process_items'):
+            self._process_items()
+        return {
+            'version': self.ddragon.version,
+            'items_data': self.items_data,
+            'runes_data': self.ddragon.get_runes(),
+            'champions_data': self.ddragon.get_champions(),
+            'items': self.items
+        }
+
     def _process_items(self):
         self.items = {}
         for item_id, item_data in self.items_data['data'].items():
@@ -58,9 +81,9 @@ class BuildGenerator:
             'omnivamp': stats.get('PercentOmniVampMod', 0)
         }
     
-    def generate_build(self, champion_name: str, role: str = 'mid', use_api: bool = False) -> Optional[Dict]:
-        champions_data = self.ddragon.get_champions()
-        champion = self._find_champion(champions_data, champion_name)
+    def generate_build(self, champion_name: str, role: str = 'mid', use_api: bool = False,
+                       offline: bool = False) -> Optional[Dict]:
+        champion = self._find_champion(self.champions_data, champion_name)
         
         if not champion:
             return None
@@ -68,15 +91,44 @@ class BuildGenerator:
         champion_details = self.ddragon.get_champion_details(champion['id'])
         champion_info = champion_details['data'][champion['id']]
         
-        if use_api and os.path.exists('riot_api_key.txt'):
+        if offline:
+            # Real-data build from the local match cache: no network, no API key
+            try:
+                from riot_api_client import RiotAPIClient
+                
+                client = RiotAPIClient(api_key=None, region=self.regions[0])
+                with metrics.timer(phase='generate_build', source='match_cache'):
+                    analysis = client.analyze_champion_builds(champion_name, role, offline=True)
+                
+                if analysis and analysis.get('total_games', 0) > 0:
+                    print(f"\n✅ Using cached match data: {analysis['total_games']} games analyzed")
+                    return self._format_api_build(analysis, champion['name'], champion_info, source='match_cache')
+                else:
+                    print(f"\n⚠️  No cached games for this champion, using fallback system")
+            except KeyboardInterrupt:
+                print(f"\n\n⚠️  Analysis interrupted by user")
+                raise
+            except Exception as e:
+                print(f"\n⚠️  Cached analysis failed: {e}")
+        
+        elif use_api and os.path.exists('riot_api_key.txt'):
             try:
                 from riot_api_client import RiotAPIClient
                 
                 with open('riot_api_key.txt', 'r') as f:
                     api_key = f.read().strip()
                 
-                client = RiotAPIClient(api_key=api_key, region='euw1')
-                analysis = client.analyze_champion_builds(champion_name, role, match_count=50)
+                from request_scheduler import INTERACTIVE
+                
+                # A lookup someone is waiting on goes ahead of any background crawl
+                if len(self.regions) > 1:
+                    from multi_region_crawler import MultiRegionCrawler
+                    client = MultiRegionCrawler(self.regions, api_key=api_key, priority=INTERACTIVE)
+                else:
+                    client = RiotAPIClient(api_key=api_key, region=self.regions[0], priority=INTERACTIVE)
+                # Stop as soon as the build is stable; 50 games is only the ceiling
+                with metrics.timer(phase='generate_build', source='riot_api'):
+                    analysis = client.analyze_champion_builds(champion_name, role, match_count=50, converge=True)
                 
                 # Check if analysis actually succeeded (has games)
                 if analysis and analysis.get('total_games', 0) > 0:
@@ -93,9 +145,11 @@ class BuildGenerator:
                 traceback.print_exc()
         
         print(f"\n📊 Using expert system fallback")
-        return self._fallback_build(champion_info, role or 'Mid')
+        with metrics.timer(phase='generate_build', source='expert_system'):
+            return self._fallback_build(champion_info, role or 'Mid')
     
-    def _format_api_build(self, analysis: Dict, champion_name: str, champion_info: Dict) -> Dict:
+    def _format_api_build(self, analysis: Dict, champion_name: str, champion_info: Dict,
+                          source: str = 'riot_api') -> Dict:
         """Format API analysis results into build display format"""
         starting_items = []
         for item_id in analysis.get('starting_items', []):
@@ -167,7 +221,7 @@ class BuildGenerator:
             'core_items': core_items,
             'boots': boots,
             'situational_items': [],
-            'source': 'riot_api',
+            'source': source,
             'stats': {
                 'winrate': analysis.get('winrate', 0),
                 'matches': analysis.get('total_games', 0)
@@ -0,0 +1,155 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from cache_codec import atomic_write, file_lock, read_cached
+from build_stats import (
+    add_participant, dump_builds_data, load_builds_data, merge_builds_data,
+    new_builds_data, normalize_role, walk_new_matches
+)
+
+
+ANY_ROLE = 'ANY'
+
+
+def index_key(champion_name: str, api_role: Optional[str] = None) -> str:
+    return f"{champion_name.lower()}|{api_role or ANY_ROLE}"
+
+
+def count_match(entries: Dict[str, Dict], match_data: Dict):
+    """Count every participant of one match under (champion, role) and (champion, any role)"""
+    for participant in match_data['info']['participants']:
+        champion = participant['championName']
+        keys = [index_key(champion)]
+        position = participant.get('teamPosition', '').upper()
+        if position:
+            keys.append(index_key(champion, position))
+
+        for key in keys:
+            builds_data = entries.get(key)
+            if builds_data is None:
+                builds_data = entries[key] = new_builds_data()
+            add_participant(builds_data, participant)
+
+
+def index_match_files(paths: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+    """Index one chunk of cached match files (runs inside a worker process)"""
+    entries = {}
+    match_ids = []
+    for path in paths:
+        try:
+            # Corrupt files (e.g. truncated gzip) are quarantined and refetched, not counted
+            match_data = read_cached(path)
+        except OSError:
+            continue
+        if match_data is None:
+            continue
+
+        count_match(entries, match_data)
+        match_ids.append(Path(path).stem[len('match_'):])
+
+    return entries, match_ids
+
+
+class BuildIndex:
+    """
+    Persistent champion x role build counts over every cached match.
+
+    One pass over cache/match_*.json fills item, boot, starting item, rune and
+    summoner counts for all ten participants of each match, so a build query is
+    a dictionary lookup instead of a corpus scan.
+
+    The manifest records which match IDs are already counted. refresh() only
+    reads match files missing from it, and add_match() folds a freshly fetched
+    match in place, so updating costs in proportion to new data only.
+    """
+
+    INDEX_VERSION = 2
+
+    def __init__(self, cache_dir: str = 'cache'):
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / 'build_index.json'
+        self.entries: Dict[str, Dict] = {}
+        self.match_ids: Set[str] = set()
+        self.dirty = False
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        self.entries = {}
+        self.match_ids = set()
+        data = read_cached(self.index_file)
+        if data is None:
+            return
+
+        # Counting rules changed since this index was written: rebuild from scratch
+        if data.get('version') != self.INDEX_VERSION:
+            return
+
+        self.match_ids = set(data['manifest'])
+        self.entries = {key: load_builds_data(dumped) for key, dumped in data['entries'].items()}
+
+    def save(self):
+        # Counts and manifest go in one file so they can never disagree. A concurrent
+        # saver's extra matches are not merged; refresh() picks them up from their files.
+        with self._lock, file_lock(self.index_file):
+            data = {
+                'version': self.INDEX_VERSION,
+                'manifest': sorted(self.match_ids),
+                'entries': {key: dump_builds_data(builds_data) for key, builds_data in self.entries.items()}
+            }
+            atomic_write(self.index_file, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+            self.dirty = False
+
+    def flush(self):
+        """Save only if add_match() changed something since the last save"""
+        if self.dirty:
+            self.save()
+
+    def _merge_entries(self, entries: Dict[str, Dict]):
+        for key, builds_data in entries.items():
+            if key in self.entries:
+                merge_builds_data(self.entries[key], builds_data)
+            else:
+                self.entries[key] = builds_data
+
+    def add_match(self, match_id: str, match_data: Dict) -> bool:
+        """Count one match in place unless the manifest already has it; call flush() to persist"""
+        with self._lock:
+            if match_id in self.match_ids:
+                return False
+            entries = {}
+            count_match(entries, match_data)
+            self._merge_entries(entries)
+            self.match_ids.add(match_id)
+            self.dirty = True
+            return True
+
+    def refresh(self, workers: int = None) -> int:
+        """Count cached matches (files and match log records) added since the last refresh; returns how many"""
+        with self._lock:
+            known = set(self.match_ids)
+        logged, results = walk_new_matches(self.cache_dir, known, index_match_files, workers)
+
+        added = sum(1 for match_id, match_data in logged if self.add_match(match_id, match_data))
+        with self._lock:
+            for entries, match_ids in results:
+                # Another thread may have added some of these through add_match() meanwhile:
+                # recount the rest of the chunk rather than count those twice
+                if self.match_ids.intersection(match_ids):
+                    entries, match_ids = index_match_files([
+                        str(self.cache_dir / f'match_{match_id}.json')
+                        for match_id in match_ids if match_id not in self.match_ids
+                    ])
+                self._merge_entries(entries)
+                self.match_ids.update(match_ids)
+                added += len(match_ids)
+
+        if added:
+            self.save()
+        return added
+
+    def lookup(self, champion_name: str, role: str = None) -> Optional[Dict]:
+        with self._lock:
+            return self.entries.get(index_key(champion_name, normalize_role(role)))
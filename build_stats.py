@@ -0,0 +1,197 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar, Union
+
+from match_log import MatchLog
+
+
+T = TypeVar('T')
+
+
+# Map common role names to Riot API teamPosition values
+ROLE_MAPPING = {
+    'top': 'TOP',
+    'jungle': 'JUNGLE',
+    'mid': 'MIDDLE',
+    'middle': 'MIDDLE',
+    'adc': 'BOTTOM',
+    'bottom': 'BOTTOM',
+    'bot': 'BOTTOM',
+    'support': 'UTILITY',
+    'utility': 'UTILITY',
+    'sup': 'UTILITY'
+}
+
+BOOTS_IDS = ['1001', '3006', '3009', '3020', '3047', '3111', '3117', '3158']
+
+
+def normalize_role(role: Optional[str]) -> Optional[str]:
+    if not role:
+        return None
+    return ROLE_MAPPING.get(role.lower(), role.upper())
+
+
+COUNTER_KEYS = ('items', 'boots', 'starting_items', 'runes', 'summoners')
+
+
+def new_builds_data() -> Dict:
+    # Counters rather than defaultdicts so partial aggregates merge with update()
+    return {
+        'items': Counter(),
+        'boots': Counter(),
+        'starting_items': Counter(),
+        'runes': Counter(),
+        'summoners': Counter(),
+        'total_games': 0,
+        'wins': 0
+    }
+
+
+def add_participant(builds_data: Dict, participant: Dict):
+    """Count one participant's items, boots, starting items, runes and summoners"""
+    builds_data['total_games'] += 1
+    if participant['win']:
+        builds_data['wins'] += 1
+
+    # Separate boots from regular items
+    all_items = [participant[f'item{i}'] for i in range(6) if participant.get(f'item{i}', 0) > 0]
+
+    boots = [item for item in all_items if str(item) in BOOTS_IDS]
+    regular_items = [item for item in all_items if str(item) not in BOOTS_IDS]
+
+    for item in regular_items:
+        builds_data['items'][item] += 1
+
+    for boot in boots:
+        builds_data['boots'][boot] += 1
+
+    starting = tuple(sorted(all_items[:2])) if len(all_items) >= 2 else tuple(all_items)
+    if starting:
+        builds_data['starting_items'][starting] += 1
+
+    # Get full rune page (primary + secondary)
+    perks = participant.get('perks', {})
+    styles = perks.get('styles', [])
+
+    if len(styles) >= 2:
+        rune_primary = styles[0].get('style')
+        rune_keystone = styles[0].get('selections', [{}])[0].get('perk')
+        rune_secondary = styles[1].get('style')
+
+        if rune_primary and rune_keystone and rune_secondary:
+            builds_data['runes'][(rune_primary, rune_keystone, rune_secondary)] += 1
+
+    summ_key = tuple(sorted([participant['summoner1Id'], participant['summoner2Id']]))
+    builds_data['summoners'][summ_key] += 1
+
+
+def merge_builds_data(target: Dict, other: Dict) -> Dict:
+    """Add other's counts into target; partial aggregates from any source combine this way"""
+    for key in COUNTER_KEYS:
+        target[key].update(other[key])
+    target['total_games'] += other['total_games']
+    target['wins'] += other['wins']
+    return target
+
+
+def summarize_builds(builds_data: Dict, champion_name: str, role: Optional[str]) -> Dict:
+    """Turn raw counts into the analysis dict consumed by BuildGenerator._format_api_build"""
+    winrate = (builds_data['wins'] / builds_data['total_games']) * 100
+
+    most_common_items = sorted(builds_data['items'].items(), key=lambda x: x[1], reverse=True)[:6]
+    most_common_boots = max(builds_data['boots'].items(), key=lambda x: x[1])[0] if builds_data['boots'] else None
+    most_common_start = max(builds_data['starting_items'].items(), key=lambda x: x[1])[0] if builds_data['starting_items'] else []
+    most_common_runes = max(builds_data['runes'].items(), key=lambda x: x[1])[0] if builds_data['runes'] else (None, None, None)
+    most_common_summs = max(builds_data['summoners'].items(), key=lambda x: x[1])[0] if builds_data['summoners'] else []
+
+    # Safely extract runes
+    rune_primary = most_common_runes[0] if most_common_runes and len(most_common_runes) > 0 else None
+    rune_keystone = most_common_runes[1] if most_common_runes and len(most_common_runes) > 1 else None
+    rune_secondary = most_common_runes[2] if most_common_runes and len(most_common_runes) > 2 else None
+
+    return {
+        'champion': champion_name,
+        'role': role or 'Any',
+        'total_games': builds_data['total_games'],
+        'winrate': winrate,
+        'core_items': [item[0] for item in most_common_items],
+        'boots': most_common_boots,
+        'starting_items': list(most_common_start),
+        'runes': {
+            'primary': rune_primary,
+            'keystone': rune_keystone,
+            'secondary': rune_secondary
+        },
+        'summoners': list(most_common_summs)
+    }
+
+
+def dump_builds_data(builds_data: Dict) -> Dict:
+    """JSON-safe copy of builds_data: counter keys become strings like '1056' or '8100,8112,8200'"""
+    dumped = {
+        'total_games': builds_data['total_games'],
+        'wins': builds_data['wins']
+    }
+    for key in COUNTER_KEYS:
+        dumped[key] = {
+            ','.join(str(v) for v in value) if isinstance(value, tuple) else str(value): count
+            for value, count in builds_data[key].items()
+        }
+    return dumped
+
+
+def load_builds_data(dumped: Dict) -> Dict:
+    builds_data = new_builds_data()
+    builds_data['total_games'] = dumped['total_games']
+    builds_data['wins'] = dumped['wins']
+    for key in ('items', 'boots'):
+        for value, count in dumped[key].items():
+            builds_data[key][int(value)] = count
+    for key in ('starting_items', 'runes', 'summoners'):
+        for value, count in dumped[key].items():
+            builds_data[key][tuple(int(v) for v in value.split(',') if v)] = count
+    return builds_data
+
+
+def chunk_paths(paths: Iterable[Path], chunks: int) -> List[List[str]]:
+    paths = [str(path) for path in paths]
+    chunks = max(1, min(chunks, len(paths)))
+    return [paths[i::chunks] for i in range(chunks)]
+
+
+def walk_new_matches(cache_dir: Union[str, Path], known: Set[str], parse_files: Callable[[List[str]], T],
+                     workers: int = None) -> Tuple[List[Tuple[str, Dict]], List[T]]:
+    """
+    Every cached match whose ID is not in known, for the persistent indexes to
+    fold in: (match_id, match_data) pairs from the match log, and
+    parse_files(chunk) results over the match_*.json files, computed in worker
+    processes once there are enough of them.
+    """
+    cache_dir = Path(cache_dir)
+    logged = []
+    if MatchLog.exists(cache_dir):
+        log = MatchLog(cache_dir)
+        for match_id in log.match_ids():
+            if match_id not in known:
+                match_data = log.get(match_id)
+                if match_data is not None:
+                    logged.append((match_id, match_data))
+        log.close()
+
+    skip = known | {match_id for match_id, _ in logged}
+    new_files = [
+        path for path in sorted(cache_dir.glob('match_*.json'))
+        if path.stem[len('match_'):] not in skip
+    ]
+    if not new_files:
+        return logged, []
+
+    workers = workers or os.cpu_count() or 1
+    if len(new_files) < 50 or workers == 1:
+        # Not worth starting worker processes for a handful of files
+        return logged, [parse_files([str(path) for path in new_files])]
+    chunks = chunk_paths(new_files, workers)
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        return logged, list(pool.map(parse_files, chunks))
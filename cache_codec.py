@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Compact, compressed encoding for cache/ JSON files.
+
+Files keep their .json names; new writes are gzip-compressed JSON without
+indentation, and reads accept both gzip and the older plain indented files.
+
+Writes go to a temp file that is renamed over the target, so an interrupted
+or concurrent writer never leaves a truncated file. read_cached() moves
+files that still fail to decode to cache/quarantine/ and reports a miss.
+file_lock() serializes read-modify-write updates of shared files across
+threads and processes.
+
+Usage:
+    python cache_codec.py migrate [CACHE_DIR]    # rewrite plain files in place
+    python cache_codec.py report [CACHE_DIR]     # count plain vs compressed files
+"""
+
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from metrics import cache_type, metrics
+
+GZIP_MAGIC = b'\x1f\x8b'
+COMPRESS_LEVEL = 6
+QUARANTINE_DIR = 'quarantine'
+# Not walked by migrate/report: quarantined files are kept as found, the match log has its own segments
+SKIPPED_DIRS = (QUARANTINE_DIR, 'match_log')
+
+
+def encode(data: Any) -> bytes:
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    # mtime=0 keeps the output byte-identical for identical data
+    return gzip.compress(raw, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def decode(raw: bytes) -> Any:
+    if raw[:2] == GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    with open(path, 'rb') as f:
+        raw = f.read()
+    metrics.inc('cache_bytes_read_total', len(raw), type=cache_type(path))
+    return decode(raw)
+
+
+def read_cached(path: Union[str, Path]) -> Optional[Any]:
+    """Cache lookup: the decoded file, or None if it is missing or corrupt (corrupt files are quarantined)"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    metrics.inc('cache_bytes_read_total', len(raw), type=cache_type(path))
+
+    try:
+        return decode(raw)
+    except (ValueError, EOFError, OSError, zlib.error):
+        quarantine(path)
+        return None
+
+
+def quarantine(path: Union[str, Path]) -> Optional[Path]:
+    """Move a corrupt cache file to quarantine/ next to it, so it is refetched and can be inspected"""
+    path = Path(path)
+    target_dir = path.parent / QUARANTINE_DIR
+    target = target_dir / f"{path.name}.{int(time.time())}"
+    try:
+        target_dir.mkdir(exist_ok=True)
+        os.replace(path, target)
+    except OSError:
+        # Already moved or replaced by another reader/writer
+        return None
+    metrics.inc('cache_corrupt_total', type=cache_type(path))
+    print(f"⚠️  Corrupt cache file {path.name} moved to {target}")
+    return target
+
+
+def atomic_write(path: Union[str, Path], raw: bytes):
+    """Write raw to a temp file in the same directory and rename it over path"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Includes KeyboardInterrupt: never leave the temp file behind
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path: Union[str, Path], data: Any):
+    atomic_write(path, encode(data))
+
+
+@contextmanager
+def file_lock(path: Union[str, Path]) -> Iterator[None]:
+    """Exclusive lock for one cache key, across threads and processes (held on <path>.lock)"""
+    path = Path(path)
+    with open(path.with_name(path.name + '.lock'), 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            # LK_LOCK retries for ~10s before raising; retry until the holder is done
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def cache_files(cache_dir: Union[str, Path]) -> List[Path]:
+    """Every JSON file under cache_dir, including the per-patch static data, minus quarantined ones"""
+    cache_dir = Path(cache_dir)
+    return sorted(
+        path for path in cache_dir.rglob('*.json')
+        if not any(part in SKIPPED_DIRS or part.startswith('.')
+                   for part in path.relative_to(cache_dir).parts[:-1])
+    )
+
+
+def migrate(cache_dir: Union[str, Path] = 'cache') -> Dict:
+    """Rewrite every plain JSON file in cache_dir in the compact encoding and report the savings"""
+    report = {'files': 0, 'bytes_before': 0, 'bytes_after': 0, 'load_before': 0.0, 'load_after': 0.0}
+
+    for path in cache_files(cache_dir):
+        if is_compressed(path):
+            continue
+
+        # Load times include the file read, as a cache lookup would
+        start = time.perf_counter()
+        raw = path.read_bytes()
+        data = json.loads(raw)
+        report['load_before'] += time.perf_counter() - start
+
+        encoded = encode(data)
+        atomic_write(path, encoded)
+
+        start = time.perf_counter()
+        read_json(path)
+        report['load_after'] += time.perf_counter() - start
+
+        report['files'] += 1
+        report['bytes_before'] += len(raw)
+        report['bytes_after'] += len(encoded)
+
+    return report
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('migrate', 'report'):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    cache_dir = Path(sys.argv[2] if len(sys.argv) > 2 else 'cache')
+
+    if sys.argv[1] == 'migrate':
+        report = migrate(cache_dir)
+        if not report['files']:
+            print("✅ Nothing to migrate, cache is already compact")
+            return
+        before = report['bytes_before'] / 1024 / 1024
+        after = report['bytes_after'] / 1024 / 1024
+        print(f"✅ Migrated {report['files']} files")
+        print(f"   Disk: {before:.1f} MB → {after:.1f} MB ({(1 - after / before) * 100:.0f}% smaller)")
+        print(f"   Load: {report['load_before']:.2f}s → {report['load_after']:.2f}s")
+    else:
+        files = cache_files(cache_dir)
+        compressed = sum(1 for path in files if is_compressed(path))
+        size = sum(path.stat().st_size for path in files) / 1024 / 1024
+        print(f"📦 {len(files)} files, {size:.1f} MB: {compressed} compressed, {len(files) - compressed} plain")
+
+
+if __name__ == "__main__":
+    main()
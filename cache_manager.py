@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Size-bounded housekeeping for cache/.
+
+Usage:
+    python cache_manager.py report [--cache-dir cache]
+    python cache_manager.py gc [--max-mb 500] [--max-entries 20000] [--policy lru|age]
+                               [--evict-indexed] [--dry-run] [--cache-dir cache]
+
+gc deletes files until the cache fits both budgets: quarantined and stale
+temp files first, then the static data and snapshots of old patches, then
+match and league files, least recently used first (lru) or oldest game
+first (age). Index files and the current patch's static data are never
+evicted, and neither are matches counted in build_index.json or
+participants.sqlite3 unless --evict-indexed is given (their counts stay in
+the indexes). The segmented match log (cache/match_log/) is never evicted
+either; match_log.py compact reclaims its deleted records.
+"""
+
+import argparse
+import shutil
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from cache_codec import QUARANTINE_DIR, read_cached
+from match_log import LOG_DIR
+
+
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 20000
+
+POLICIES = ('lru', 'age')
+
+STALE_TEMP_SECONDS = 3600
+
+# Shared state and aggregates; deleting them loses work, not just a cached response
+INDEX_FILES = {
+    'build_index.json', 'match_id_index.json', 'negative_cache.json',
+    'participants.sqlite3', 'participants.sqlite3-journal', 'participants.sqlite3-wal', 'participants.sqlite3-shm',
+}
+
+# Eviction order between kinds; within a rank the policy decides
+EVICT_RANK = {'quarantine': 0, 'temp': 0, 'old_static': 1, 'old_snapshot': 1, 'league': 2, 'match': 2, 'other': 2}
+
+
+class CacheEntry(NamedTuple):
+    """One evictable unit: a file, or a whole cache/ddragon/<version>/ directory"""
+    path: Path
+    kind: str
+    size: int
+    files: int
+    last_used: float   # max(atime, mtime); atime alone is unreliable on noatime mounts
+    age_key: float     # game end for matches (from participants.sqlite3), else mtime
+    pinned: bool
+
+
+def indexed_match_ids(cache_dir: Path) -> Set[str]:
+    """Match IDs whose counts are persisted in build_index.json or participants.sqlite3"""
+    match_ids = set()
+    index = read_cached(cache_dir / 'build_index.json')
+    if index:
+        match_ids.update(index.get('manifest', []))
+    match_ids.update(match_game_ends(cache_dir))
+    return match_ids
+
+
+def match_game_ends(cache_dir: Path) -> Dict[str, float]:
+    """gameEndTimestamp (seconds) per match from participants.sqlite3, without creating it"""
+    db_file = cache_dir / 'participants.sqlite3'
+    if not db_file.exists():
+        return {}
+    try:
+        conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        try:
+            return {match_id: game_end / 1000 for match_id, game_end in
+                    conn.execute('SELECT match_id, game_end FROM matches WHERE game_end IS NOT NULL')}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+def current_patch(cache_dir: Path) -> Optional[str]:
+    pointer = read_cached(cache_dir / 'ddragon' / 'current.json')
+    return pointer['version'] if pointer else None
+
+
+class CacheManager:
+    """
+    Inventory and budgeted eviction of cache/.
+
+    Pins index files, the current patch's static data and snapshot, and (with
+    pin_indexed) every match already counted by a persisted aggregate.
+    """
+
+    def __init__(self, cache_dir: str = 'cache', max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, policy: str = 'lru', pin_indexed: bool = True):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy {policy!r}, expected one of {POLICIES}")
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+        self.pin_indexed = pin_indexed
+
+    def _file_entry(self, path: Path, kind: str, pinned: bool, age_key: float = None) -> Optional[CacheEntry]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return CacheEntry(path, kind, stat.st_size, 1, max(stat.st_atime, stat.st_mtime),
+                          age_key if age_key is not None else stat.st_mtime, pinned)
+
+    def _dir_entry(self, path: Path, kind: str, pinned: bool) -> CacheEntry:
+        size = files = 0
+        last_used = age_key = 0.0
+        for file in path.rglob('*'):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            if file.is_file():
+                size += stat.st_size
+                files += 1
+                last_used = max(last_used, stat.st_atime, stat.st_mtime)
+                age_key = max(age_key, stat.st_mtime)
+        return CacheEntry(path, kind, size, files, last_used, age_key, pinned)
+
+    def scan(self) -> List[CacheEntry]:
+        """Every file under cache_dir, classified and marked pinned or evictable"""
+        patch = current_patch(self.cache_dir)
+        indexed = indexed_match_ids(self.cache_dir) if self.pin_indexed else set()
+        game_ends = match_game_ends(self.cache_dir) if self.policy == 'age' else {}
+        entries = []
+
+        for path in self.cache_dir.iterdir():
+            name = path.name
+            if path.is_dir():
+                if name == 'ddragon':
+                    for child in path.iterdir():
+                        if child.is_dir() and not child.name.startswith('.'):
+                            current = child.name == patch
+                            entries.append(self._dir_entry(child, 'static' if current else 'old_static', current))
+                        elif child.is_file():
+                            entry = self._file_entry(child, 'index', True)
+                            if entry:
+                                entries.append(entry)
+                elif name == LOG_DIR:
+                    # Records live inside shared segments; match_log.py compact reclaims deleted ones
+                    entries.append(self._dir_entry(path, 'match_log', True))
+                elif name == QUARANTINE_DIR:
+                    entries.extend(entry for entry in (self._file_entry(child, 'quarantine', False)
+                                                       for child in path.iterdir() if child.is_file()) if entry)
+                else:
+                    entries.append(self._dir_entry(path, 'other', True))
+                continue
+
+            if name.startswith('match_') and name.endswith('.json'):
+                match_id = name[len('match_'):-len('.json')]
+                entry = self._file_entry(path, 'match', match_id in indexed, game_ends.get(match_id))
+            elif name.startswith(('challenger_', 'master_')):
+                entry = self._file_entry(path, 'league', False)
+            elif name.startswith('static_') and name.endswith('.pickle'):
+                current = name == f"static_{patch}.pickle"
+                entry = self._file_entry(path, 'snapshot' if current else 'old_snapshot', current)
+            elif name.endswith('.tmp'):
+                # Left behind by a killed writer once it is older than any write could take
+                entry = self._file_entry(path, 'temp', False)
+                if entry and time.time() - entry.age_key < STALE_TEMP_SECONDS:
+                    entry = entry._replace(pinned=True)
+            elif name in INDEX_FILES or name.endswith('.lock'):
+                entry = self._file_entry(path, 'index', True)
+            else:
+                entry = self._file_entry(path, 'other', False)
+            if entry:
+                entries.append(entry)
+
+        return entries
+
+    def eviction_order(self, entries: List[CacheEntry]) -> List[CacheEntry]:
+        key = (lambda entry: entry.last_used) if self.policy == 'lru' else (lambda entry: entry.age_key)
+        candidates = [entry for entry in entries if not entry.pinned]
+        return sorted(candidates, key=lambda entry: (EVICT_RANK.get(entry.kind, 2), key(entry)))
+
+    def collect(self, dry_run: bool = False) -> Dict:
+        """Evict until the cache fits both budgets; returns what was (or would be) removed"""
+        entries = self.scan()
+        total_bytes = sum(entry.size for entry in entries)
+        total_files = sum(entry.files for entry in entries)
+        result = {'evicted': 0, 'files': 0, 'bytes': 0, 'by_kind': defaultdict(int),
+                  'bytes_before': total_bytes, 'files_before': total_files}
+
+        for entry in self.eviction_order(entries):
+            if total_bytes <= self.max_bytes and total_files <= self.max_entries:
+                break
+            if not dry_run:
+                try:
+                    if entry.path.is_dir():
+                        shutil.rmtree(entry.path)
+                    else:
+                        entry.path.unlink()
+                except FileNotFoundError:
+                    pass
+            total_bytes -= entry.size
+            total_files -= entry.files
+            result['evicted'] += 1
+            result['files'] += entry.files
+            result['bytes'] += entry.size
+            result['by_kind'][entry.kind] += entry.files
+
+        result['bytes_after'] = total_bytes
+        result['files_after'] = total_files
+        result['within_budget'] = total_bytes <= self.max_bytes and total_files <= self.max_entries
+        return result
+
+    def report(self) -> Dict:
+        """Files, bytes and pinned share per kind, plus the budget"""
+        kinds = defaultdict(lambda: {'files': 0, 'bytes': 0, 'pinned_files': 0, 'pinned_bytes': 0,
+                                     'oldest': None, 'newest': None})
+        for entry in self.scan():
+            stats = kinds[entry.kind]
+            stats['files'] += entry.files
+            stats['bytes'] += entry.size
+            if entry.pinned:
+                stats['pinned_files'] += entry.files
+                stats['pinned_bytes'] += entry.size
+            stats['oldest'] = min(stats['oldest'] or entry.age_key, entry.age_key)
+            stats['newest'] = max(stats['newest'] or entry.age_key, entry.age_key)
+        return {
+            'kinds': dict(kinds),
+            'files': sum(stats['files'] for stats in kinds.values()),
+            'bytes': sum(stats['bytes'] for stats in kinds.values()),
+            'pinned_bytes': sum(stats['pinned_bytes'] for stats in kinds.values()),
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'patch': current_patch(self.cache_dir)
+        }
+
+
+def format_mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def print_report(report: Dict):
+    print(f"📦 {report['files']} files, {format_mb(report['bytes'])} "
+          f"(budget {format_mb(report['max_bytes'])}, {report['max_entries']} files), "
+          f"patch {report['patch'] or 'unknown'}\n")
+    print(f"  {'kind':<14}{'files':>8}{'size':>12}{'pinned':>12}   {'oldest':<12}{'newest':<12}")
+    for kind, stats in sorted(report['kinds'].items(), key=lambda item: -item[1]['bytes']):
+        oldest = time.strftime('%Y-%m-%d', time.localtime(stats['oldest'])) if stats['oldest'] else '-'
+        newest = time.strftime('%Y-%m-%d', time.localtime(stats['newest'])) if stats['newest'] else '-'
+        print(f"  {kind:<14}{stats['files']:>8}{format_mb(stats['bytes']):>12}"
+              f"{format_mb(stats['pinned_bytes']):>12}   {oldest:<12}{newest:<12}")
+
+    if report['bytes'] > report['max_bytes'] or report['files'] > report['max_entries']:
+        print("\n⚠️  Over budget: run 'python cache_manager.py gc'")
+    if report['pinned_bytes'] > report['max_bytes']:
+        print(f"⚠️  Pinned files alone ({format_mb(report['pinned_bytes'])}) exceed the byte budget; "
+              f"--evict-indexed allows removing matches already counted in the indexes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=('report', 'gc'))
+    parser.add_argument('--cache-dir', default='cache')
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024)
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument('--policy', choices=POLICIES, default='lru')
+    parser.add_argument('--evict-indexed', action='store_true',
+                        help='also evict matches already counted in build_index.json/participants.sqlite3')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    if not Path(args.cache_dir).is_dir():
+        print(f"ℹ️  No cache at {args.cache_dir}")
+        return
+
+    manager = CacheManager(args.cache_dir, int(args.max_mb * 1024 * 1024), args.max_entries,
+                           args.policy, pin_indexed=not args.evict_indexed)
+
+    if args.command == 'report':
+        print_report(manager.report())
+        return
+
+    result = manager.collect(dry_run=args.dry_run)
+    verb = 'Would evict' if args.dry_run else 'Evicted'
+    kinds = ', '.join(f"{count} {kind}" for kind, count in sorted(result['by_kind'].items())) or 'nothing'
+    print(f"🧹 {verb} {result['files']} files ({format_mb(result['bytes'])}): {kinds}")
+    print(f"   {format_mb(result['bytes_before'])} / {result['files_before']} files → "
+          f"{format_mb(result['bytes_after'])} / {result['files_after']} files")
+    if not result['within_budget']:
+        print("⚠️  Still over budget: the rest is pinned (see 'python cache_manager.py report')")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import random
+import threading
+import time
+from typing import Dict
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker for the Riot API.
+
+    After `failure_threshold` consecutive server errors or timeouts against a
+    host, requests to it fail fast for `reset_timeout` seconds instead of
+    spending retries and rate budget on a degraded service. Then one trial
+    request is let through: success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures: Dict[str, int] = {}
+        self.opened_at: Dict[str, float] = {}
+        self.trial_running: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            return self._state(host, time.monotonic())
+
+    def _state(self, host: str, now: float) -> str:
+        opened_at = self.opened_at.get(host)
+        if opened_at is None:
+            return self.CLOSED
+        if now - opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to host may be sent now"""
+        with self._lock:
+            state = self._state(host, time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self.trial_running.get(host):
+                self.trial_running[host] = True
+                return True
+            return False
+
+    def release(self, host: str):
+        """Give up a trial slot that ended without a verdict (cancelled, or a 429 from the budget)"""
+        with self._lock:
+            self.trial_running[host] = False
+
+    def record_success(self, host: str):
+        with self._lock:
+            self.failures[host] = 0
+            self.opened_at.pop(host, None)
+            self.trial_running[host] = False
+
+    def record_failure(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            self.failures[host] = self.failures.get(host, 0) + 1
+            if self.trial_running.get(host) or self.failures[host] >= self.failure_threshold:
+                self.opened_at[host] = now
+            self.trial_running[host] = False
+
+
+# Shared by every client in the process: a degraded host is degraded for all of them
+shared_breaker = CircuitBreaker()
@@ -0,0 +1,69 @@
+import math
+from typing import Dict, Optional, Tuple
+
+
+def wilson_lower_bound(successes: int, total: int, z: float = 1.96) -> float:
+    """Lower end of the Wilson score interval for a share of successes/total"""
+    if total == 0:
+        return 0.0
+    p = successes / total
+    denominator = 1 + z * z / total
+    centre = p + z * z / (2 * total)
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+    return (centre - margin) / denominator
+
+
+class ConvergenceTracker:
+    """
+    Decides when a champion's recommended build has settled, so a crawl can stop early.
+
+    The build counts as stable once:
+      - at least min_games games were seen,
+      - the top-k core items, the most common rune page and the most common
+        summoner pair have not changed for `patience` consecutive games,
+      - the leading rune page and summoner pair are ahead of their runner-up
+        with confidence (Wilson lower bound of the leader's share above the
+        runner-up's observed share).
+    """
+
+    def __init__(self, top_k: int = 6, patience: int = 10, min_games: int = 15, z: float = 1.96):
+        self.top_k = top_k
+        self.patience = patience
+        self.min_games = min_games
+        self.z = z
+        self.snapshot: Optional[Tuple] = None
+        self.stable_games = 0
+        self.converged = False
+
+    def _leader_is_confident(self, counts: Dict, total: int) -> bool:
+        ranked = counts.most_common(2)
+        if not ranked:
+            return False
+        runner_up_share = ranked[1][1] / total if len(ranked) > 1 else 0.0
+        return wilson_lower_bound(ranked[0][1], total, self.z) > runner_up_share
+
+    def update(self, builds_data: Dict) -> bool:
+        """Feed the aggregate after each new game; returns True once the build is stable"""
+        top_items = frozenset(item for item, _ in builds_data['items'].most_common(self.top_k))
+        top_runes = builds_data['runes'].most_common(1)
+        top_summoners = builds_data['summoners'].most_common(1)
+        snapshot = (
+            top_items,
+            top_runes[0][0] if top_runes else None,
+            top_summoners[0][0] if top_summoners else None
+        )
+
+        if snapshot == self.snapshot:
+            self.stable_games += 1
+        else:
+            self.snapshot = snapshot
+            self.stable_games = 0
+
+        total = builds_data['total_games']
+        self.converged = (
+            total >= self.min_games
+            and self.stable_games >= self.patience
+            and self._leader_is_confident(builds_data['runes'], total)
+            and self._leader_is_confident(builds_data['summoners'], total)
+        )
+        return self.converged
@@ -1,96 +1,358 @@
-import requests
+#!/usr/bin/env python3
+"""
+Data Dragon static data (champions, items, runes), cached per patch.
+
+Usage:
+    python data_dragon_client.py champions                  # cache every champion's details in one download
+    python data_dragon_client.py ingest ARCHIVE [CACHE_DIR]  # seed the cache from a dragontail-<version>.tgz
+"""
+
 import json
-from typing import Dict, List
+import os
+import re
+import requests
+import shutil
+import sys
+import tarfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
+from http_session import get_session
+from cache_codec import read_cached, read_json, write_json
+from metrics import metrics
+
+
+# <version>/data/en_US/<file> inside a dragontail archive (optionally under ./)
+DRAGONTAIL_MEMBER = re.compile(r'^(?:\./)?(\d+(?:\.\d+)+)/(data/en_US/\w+\.json)$')
+
+# Static files of one patch, as (cache name, Data Dragon path, metrics endpoint)
+STATIC_FILES = (
+    ('champions.json', 'data/en_US/champion.json', 'champion'),
+    ('items.json', 'data/en_US/item.json', 'item'),
+    ('runes.json', 'data/en_US/runesReforged.json', 'runesReforged'),
+)
+
+
+
+def write_pointer(static_dir: Path, version: str):
+    """Point static_dir/current.json at version (write_json renames into place, so readers never see half of it)"""
+    write_json(static_dir / "current.json", {'version': version})
+
+
+def split_champion_full(full: Dict, target: Path) -> Dict[str, Dict]:
+    """Write championFull.json as one champion_<id>.json per champion, shaped like the per-champion endpoint"""
+    details = {}
+    for champion_id, champion in full['data'].items():
+        details[champion_id] = {
+            'type': 'champion',
+            'format': 'standAloneComplex',
+            'version': full['version'],
+            'data': {champion_id: champion}
+        }
+        write_json(target / f"champion_{champion_id}.json", details[champion_id])
+    return details
+
+
+def version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+
+def ingest_dragontail(archive: Union[str, Path], cache_dir: Union[str, Path] = "cache") -> str:
+    """
+    Seed cache/ddragon/<version>/ from a local dragontail-<version>.tgz.
+
+    The archive is read as a stream: only the en_US champion, championFull,
+    item and runesReforged files are decoded, the images are skipped without
+    being written. The patch becomes current if it is newer than the current
+    one (or there is none). Returns the archive's version.
+    """
+    static_dir = Path(cache_dir) / "ddragon"
+    static_dir.mkdir(parents=True, exist_ok=True)
+    wanted = {path: name for name, path, _ in STATIC_FILES}
+    wanted['data/en_US/championFull.json'] = None
+
+    version = None
+    found: Dict[str, Dict] = {}
+    with tarfile.open(archive, 'r|gz') as tar:
+        for member in tar:
+            match = DRAGONTAIL_MEMBER.match(member.name)
+            if not match or not member.isfile() or match.group(2) not in wanted:
+                continue
+            if version is not None and match.group(1) != version:
+                raise ValueError(f"{archive} holds more than one patch ({version}, {match.group(1)})")
+            version = match.group(1)
+            found[match.group(2)] = json.load(tar.extractfile(member))
+
+    missing = sorted(set(wanted) - set(found))
+    if missing:
+        raise ValueError(f"{archive} is missing {', '.join(missing)}")
+
+    staging = static_dir / f".{version}.{os.getpid()}.partial"
+    staging.mkdir(exist_ok=True)
+    target = static_dir / version
+    try:
+        for path, name in wanted.items():
+            if name is None:
+                split_champion_full(found[path], staging)
+            else:
+                write_json(staging / name, found[path])
+        # Files land one rename at a time; the pointer only moves once all are in place
+        target.mkdir(exist_ok=True)
+        for path in staging.iterdir():
+            os.replace(path, target / path.name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    pointer_file = static_dir / "current.json"
+    if not pointer_file.exists() or version_key(version) > version_key(read_json(pointer_file)['version']):
+        write_pointer(static_dir, version)
+    return version
 
 
 class DataDragonClient:
+    """
+    Static game data, cached per patch under cache/ddragon/<version>/.
+
+    cache/ddragon/current.json names the patch in use, so startup never waits
+    on the network. A background thread checks versions.json at most once per
+    UPDATE_CHECK_INTERVAL; a new patch is downloaded next to the current one
+    and the pointer is swapped once it is complete, for the next startup;
+    the patch before it is kept for processes still using it.
+    """
     BASE_URL = "https://ddragon.leagueoflegends.com"
+    UPDATE_CHECK_INTERVAL = 3600  # seconds; None disables the background check
     
-    def __init__(self, cache_dir: str = "cache"):
+    def __init__(self, cache_dir: str = "cache", session: requests.Session = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.static_dir = self.cache_dir / "ddragon"
+        self.static_dir.mkdir(exist_ok=True)
+        self.session = session or get_session()
+        self.timeout = 10
+        # champion id -> details, filled by get_all_champion_details()
+        self._champion_details: Optional[Dict[str, Dict]] = None
+        self._migrate_legacy_cache()
         self.version = self._get_latest_version()
+        self.update_thread: Optional[threading.Thread] = None
+        if self.UPDATE_CHECK_INTERVAL is not None:
+            self.update_thread = threading.Thread(target=self._check_quietly, name='ddragon-update', daemon=True)
+            self.update_thread.start()
+    
+    @property
+    def version_dir(self) -> Path:
+        return self.static_dir / self.version
+    
+    @property
+    def pointer_file(self) -> Path:
+        return self.static_dir / "current.json"
+    
+    def _get(self, url: str, endpoint: str) -> requests.Response:
+        start = time.perf_counter()
+        response = self.session.get(url, timeout=self.timeout)
+        metrics.observe('http_request_seconds', time.perf_counter() - start, api='ddragon', endpoint=endpoint)
+        metrics.inc('http_requests_total', api='ddragon', endpoint=endpoint, status=response.status_code)
+        return response
+    
+    def _migrate_legacy_cache(self):
+        """Move the flat cache/version.json, champions.json, ... of older releases into cache/ddragon/<version>/"""
+        legacy_version = self.cache_dir / "version.json"
+        if not legacy_version.exists() or self.pointer_file.exists():
+            return
         
-    def _get_latest_version(self) -> str:
-        cache_file = self.cache_dir / "version.json"
-        if cache_file.exists():
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                return data['version']
-        
-        url = f"{self.BASE_URL}/api/versions.json"
-        response = requests.get(url)
+        version = read_json(legacy_version)['version']
+        target = self.static_dir / version
+        target.mkdir(exist_ok=True)
+        names = [name for name, _, _ in STATIC_FILES]
+        for path in [self.cache_dir / name for name in names] + list(self.cache_dir.glob("champion_*.json")):
+            if path.exists():
+                os.replace(path, target / path.name)
+        write_pointer(self.static_dir, version)
+        legacy_version.unlink()
+        print(f"📦 Moved patch {version} static data to {target}")
+    
+    def _fetch_versions(self) -> List[str]:
+        response = self._get(f"{self.BASE_URL}/api/versions.json", 'versions')
+        response.raise_for_status()
         versions = response.json()
-        latest = versions[0]
+        # Its mtime is the time of the last check
+        write_json(self.static_dir / "versions.json", versions)
+        return versions
+    
+    def _get_latest_version(self) -> str:
+        pointer = read_cached(self.pointer_file)
+        if pointer is not None:
+            metrics.record_cache(self.pointer_file, True)
+            return pointer['version']
+        metrics.record_cache(self.pointer_file, False)
         
-        with open(cache_file, 'w') as f:
-            json.dump({'version': latest}, f)
+        latest = self._fetch_versions()[0]
+        write_pointer(self.static_dir, latest)
         
         return latest
     
+    def check_for_update(self, force: bool = False) -> Optional[str]:
+        """
+        Download the newest patch alongside the current one and point
+        current.json at it. Returns the new version, or None if up to date.
+        """
+        versions_file = self.static_dir / "versions.json"
+        if not force and versions_file.exists() \
+                and time.time() - versions_file.stat().st_mtime < self.UPDATE_CHECK_INTERVAL:
+            return None
+        
+        latest = self._fetch_versions()[0]
+        if version_key(latest) <= version_key(read_json(self.pointer_file)['version']):
+            return None
+        
+        target = self.static_dir / latest
+        if not target.exists():
+            staging = self.static_dir / f".{latest}.{os.getpid()}.partial"
+            staging.mkdir(exist_ok=True)
+            try:
+                for name, path, endpoint in STATIC_FILES:
+                    response = self._get(f"{self.BASE_URL}/cdn/{latest}/{path}", endpoint)
+                    response.raise_for_status()
+                    write_json(staging / name, response.json())
+                response = self._get(f"{self.BASE_URL}/cdn/{latest}/data/en_US/championFull.json", 'championFull')
+                response.raise_for_status()
+                split_champion_full(response.json(), staging)
+                os.rename(staging, target)
+            except OSError:
+                # Another process finished the same download first
+                if not target.exists():
+                    raise
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+        
+        write_pointer(self.static_dir, latest)
+        self._prune_versions(keep={latest, self.version})
+        return latest
+    
+    def _check_quietly(self):
+        try:
+            self.check_for_update()
+        except (requests.RequestException, OSError, ValueError, KeyError, IndexError):
+            # Offline or Data Dragon unavailable: keep the current patch, try again next startup
+            pass
+    
+    def _prune_versions(self, keep: set):
+        """Remove the static data of patches other than `keep`"""
+        for path in self.static_dir.iterdir():
+            if path.is_dir() and not path.name.startswith('.') and path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+    
     def get_champions(self) -> Dict:
-        cache_file = self.cache_dir / "champions.json"
-        if cache_file.exists():
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        cache_file = self.version_dir / "champions.json"
+        data = read_cached(cache_file)
+        if data is not None:
+            metrics.record_cache(cache_file, True)
+            return data
+        metrics.record_cache(cache_file, False)
         
         url = f"{self.BASE_URL}/cdn/{self.version}/data/en_US/champion.json"
-        response = requests.get(url)
+        response = self._get(url, 'champion')
         data = response.json()
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        self.version_dir.mkdir(exist_ok=True)
+        write_json(cache_file, data)
         
         return data
     
     def get_champion_details(self, champion_key: str) -> Dict:
-        cache_file = self.cache_dir / f"champion_{champion_key}.json"
-        if cache_file.exists():
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        if self._champion_details is not None and champion_key in self._champion_details:
+            return self._champion_details[champion_key]
+        
+        cache_file = self.version_dir / f"champion_{champion_key}.json"
+        data = read_cached(cache_file)
+        if data is not None:
+            metrics.record_cache(cache_file, True)
+            return data
+        metrics.record_cache(cache_file, False)
+        
+        # One championFull download caches the whole roster, so later lookups stay local
+        details = self.get_all_champion_details()
+        if champion_key in details:
+            return details[champion_key]
         
         url = f"{self.BASE_URL}/cdn/{self.version}/data/en_US/champion/{champion_key}.json"
-        response = requests.get(url)
+        response = self._get(url, 'champion_details')
         data = response.json()
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        self.version_dir.mkdir(exist_ok=True)
+        write_json(cache_file, data)
         
         return data
     
+    def get_all_champion_details(self) -> Dict[str, Dict]:
+        """
+        Details of every champion keyed by champion id, from the per-champion
+        cache if complete, otherwise from one championFull.json download.
+        get_champion_details answers from this index afterwards.
+        """
+        if self._champion_details is not None:
+            return self._champion_details
+        
+        full_file = self.version_dir / "championFull.json"
+        files = {champion_id: self.version_dir / f"champion_{champion_id}.json"
+                 for champion_id in self.get_champions()['data']}
+        if all(path.exists() for path in files.values()):
+            details = {champion_id: read_cached(path) for champion_id, path in files.items()}
+            if all(data is not None for data in details.values()):
+                metrics.record_cache(full_file, True)
+                self._champion_details = details
+                return self._champion_details
+        metrics.record_cache(full_file, False)
+        
+        url = f"{self.BASE_URL}/cdn/{self.version}/data/en_US/championFull.json"
+        response = self._get(url, 'championFull')
+        response.raise_for_status()
+        
+        self.version_dir.mkdir(exist_ok=True)
+        self._champion_details = split_champion_full(response.json(), self.version_dir)
+        
+        return self._champion_details
+    
     def get_items(self) -> Dict:
-        cache_file = self.cache_dir / "items.json"
-        if cache_file.exists():
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        cache_file = self.version_dir / "items.json"
+        data = read_cached(cache_file)
+        if data is not None:
+            metrics.record_cache(cache_file, True)
+            return data
+        metrics.record_cache(cache_file, False)
         
         url = f"{self.BASE_URL}/cdn/{self.version}/data/en_US/item.json"
-        response = requests.get(url)
+        response = self._get(url, 'item')
         data = response.json()
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        self.version_dir.mkdir(exist_ok=True)
+        write_json(cache_file, data)
         
         return data
     
     def get_runes(self) -> List[Dict]:
-        cache_file = self.cache_dir / "runes.json"
-        if cache_file.exists():
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        cache_file = self.version_dir / "runes.json"
+        data = read_cached(cache_file)
+        if data is not None:
+            metrics.record_cache(cache_file, True)
+            return data
+        metrics.record_cache(cache_file, False)
         
         url = f"{self.BASE_URL}/cdn/{self.version}/data/en_US/runesReforged.json"
-        response = requests.get(url)
+        response = self._get(url, 'runesReforged')
         data = response.json()
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        self.version_dir.mkdir(exist_ok=True)
+        write_json(cache_file, data)
         
         return data
     
     def clear_cache(self):
-        for file in self.cache_dir.glob("*.json"):
+        """Delete the cached static data of every patch; matches and indexes are left alone"""
+        shutil.rmtree(self.static_dir, ignore_errors=True)
+        self._champion_details = None
+        self.static_dir.mkdir(exist_ok=True)
+        for file in self.cache_dir.glob("static_*.pickle"):
             file.unlink()
     
     def refresh_data(self):
@@ -99,3 +361,34 @@ class DataDragonClient:
         self.get_champions()
         self.get_items()
         self.get_runes()
+        self.get_all_champion_details()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('champions', 'ingest') \
+            or (sys.argv[1] == 'ingest' and len(sys.argv) < 3):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    if sys.argv[1] == 'ingest':
+        start = time.perf_counter()
+        try:
+            version = ingest_dragontail(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else 'cache')
+        except (OSError, tarfile.TarError, ValueError) as e:
+            print(f"❌ Could not ingest {sys.argv[2]}: {e}")
+            sys.exit(1)
+        print(f"✅ Patch {version} ingested in {time.perf_counter() - start:.1f}s")
+        return
+
+    client = DataDragonClient()
+    start = time.perf_counter()
+    try:
+        details = client.get_all_champion_details()
+    except requests.RequestException as e:
+        print(f"❌ Could not download championFull.json: {e}")
+        sys.exit(1)
+    print(f"✅ {len(details)} champions cached for patch {client.version} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from cache_codec import read_json, write_json
+
+
+DEFAULT_POOL_CONNECTIONS = 8    # distinct hosts kept in the pool
+DEFAULT_POOL_MAXSIZE = 16       # keep-alive connections per host
+
+_shared_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def create_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                   pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> requests.Session:
+    """Build a Session with pooled keep-alive connections and gzip negotiation"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': 'LoL-Build-System/1.0',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Session shared by RiotAPIClient and DataDragonClient, created on first use"""
+    global _shared_session
+    with _lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+
+def configure_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                      pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> requests.Session:
+    """Replace the shared session, e.g. to size the pool for a crawl with many workers"""
+    global _shared_session
+    with _lock:
+        if _shared_session is not None:
+            _shared_session.close()
+        _shared_session = create_session(pool_connections, pool_maxsize)
+        return _shared_session
+
+
+def cassette_key(method: str, url: str) -> str:
+    """Host, path and sorted query of a request, so replay doesn't depend on parameter order"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return f"{method} {parts.netloc}{parts.path}{'?' + query if query else ''}"
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests for real and keeps every response for a cassette file"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.recorded: Dict[str, List[Dict]] = defaultdict(list)
+        self._record_lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading content here also releases the connection back to the pool
+        entry = {
+            'status': response.status_code,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')},
+            'body': response.content.decode('utf-8', errors='replace')
+        }
+        with self._record_lock:
+            self.recorded[cassette_key(request.method, request.url)].append(entry)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers from a cassette without touching the network. Responses recorded
+    for the same request are replayed in order, the last one repeating; a
+    request that was never recorded gets a 404.
+    """
+
+    def __init__(self, recorded: Dict[str, List[Dict]]):
+        super().__init__()
+        self.recorded = recorded
+        self.replayed: Dict[str, int] = defaultdict(int)
+        self._replay_lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = cassette_key(request.method, request.url)
+        with self._replay_lock:
+            entries = self.recorded.get(key)
+            if entries:
+                entry = entries[min(self.replayed[key], len(entries) - 1)]
+                self.replayed[key] += 1
+            else:
+                entry = {'status': 404, 'headers': {}, 'body': '{"status": {"message": "Not recorded"}}'}
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def create_recording_session() -> requests.Session:
+    """Pooled session that also records every response; save it with save_cassette()"""
+    session = create_session()
+    adapter = RecordingAdapter(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def save_cassette(session: requests.Session, path: Union[str, Path]) -> int:
+    """Write what a recording session captured; returns the number of distinct requests"""
+    adapter = session.get_adapter('https://')
+    with adapter._record_lock:
+        write_json(path, dict(adapter.recorded))
+        return len(adapter.recorded)
+
+
+def create_replay_session(path: Union[str, Path]) -> requests.Session:
+    """Session answering from a cassette written by save_cassette(), for offline reproducible runs"""
+    session = create_session()
+    adapter = ReplayAdapter(read_json(path))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -4,6 +4,7 @@ import os
 from typing import Dict, List
 from colorama import init, Fore, Style
 from build_generator import BuildGenerator
+from match_log import MatchLog
 from gameplay_analyzer import GameplayAnalyzer, GameMetrics
 
 init(autoreset=True)
@@ -14,7 +15,7 @@ class LoLManager:
         print(f"{Fore.CYAN}Loading data from Riot API...")
         self.build_gen = BuildGenerator()
         self.gameplay_analyzer = GameplayAnalyzer()
-        self.champions = self.build_gen.ddragon.get_champions()
+        self.champions = self.build_gen.champions_data
         print(f"{Fore.GREEN}✓ Loaded {len(self.champions['data'])} champions")
         print(f"{Fore.GREEN}✓ Loaded {len(self.build_gen.items)} items")
         print(f"{Fore.GREEN}✓ Patch {self.build_gen.ddragon.version}")
@@ -349,7 +350,13 @@ class LoLManager:
             print(f"{Fore.WHITE}   Get key at: https://developer.riotgames.com/")
             print(f"{Fore.WHITE}   See docs/riot_api_key.txt.example for instructions")
         
-        build = self.build_gen.generate_build(champion, role, use_api=use_api)
+        offline = False
+        cache_dir = self.build_gen.ddragon.cache_dir
+        if not use_api and (MatchLog.exists(cache_dir) or any(cache_dir.glob('match_*.json'))):
+            cache_choice = input(f"{Fore.CYAN}Use cached high-elo matches (offline)? [Y/n]: {Fore.WHITE}").strip().lower()
+            offline = cache_choice != 'n'
+        
+        build = self.build_gen.generate_build(champion, role, use_api=use_api, offline=offline)
         
         if not build:
             print(f"\n{Fore.RED}Champion '{champion}' not found!")
@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cache_codec import atomic_write, file_lock, read_cached
+
+
+class MatchIdIndex:
+    """
+    Persistent per-PUUID list of known ranked match IDs, newest first.
+
+    Alongside the IDs it keeps the newest gameEndTimestamp seen for that player
+    and when their history was last crawled, so the next crawl can ask match-v5
+    only for games that started after that point (startTime) and page backward
+    only when a caller needs more history than is already known.
+    """
+
+    def __init__(self, cache_dir: str = 'cache'):
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / 'match_id_index.json'
+        self.players: Dict[str, Dict] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.players = read_cached(self.index_file) or {}
+
+    def save(self):
+        # Keep players another process crawled since we loaded; for shared players our entry wins
+        with self._lock, file_lock(self.index_file):
+            for puuid, entry in (read_cached(self.index_file) or {}).items():
+                self.players.setdefault(puuid, entry)
+            atomic_write(self.index_file, json.dumps(self.players, separators=(',', ':')).encode('utf-8'))
+            self.dirty = False
+
+    def flush(self):
+        if self.dirty:
+            self.save()
+
+    def get(self, puuid: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self.players.get(puuid)
+            return dict(entry, ids=list(entry['ids'])) if entry else None
+
+    def add_newer(self, puuid: str, match_ids: List[str]):
+        """Record IDs returned by a newest-first crawl (already-known IDs are dropped)"""
+        with self._lock:
+            entry = self.players.setdefault(puuid, {'ids': [], 'newest_end': None, 'crawled_at': 0})
+            known = set(entry['ids'])
+            entry['ids'] = [match_id for match_id in match_ids if match_id not in known] + entry['ids']
+            entry['crawled_at'] = time.time()
+            self.dirty = True
+
+    def add_older(self, puuid: str, match_ids: List[str]):
+        """Record IDs from paging backward past the oldest known one"""
+        with self._lock:
+            entry = self.players.setdefault(puuid, {'ids': [], 'newest_end': None, 'crawled_at': 0})
+            known = set(entry['ids'])
+            entry['ids'].extend(match_id for match_id in match_ids if match_id not in known)
+            self.dirty = True
+
+    def note_match_end(self, match_data: Dict):
+        """Advance newest_end for every known participant whose list includes this match"""
+        match_id = match_data['metadata']['matchId']
+        game_end = match_data['info'].get('gameEndTimestamp')
+        if not game_end:
+            return
+
+        with self._lock:
+            for puuid in match_data['metadata'].get('participants', []):
+                entry = self.players.get(puuid)
+                if entry is None or match_id not in entry['ids']:
+                    continue
+                if entry['newest_end'] is None or game_end > entry['newest_end']:
+                    entry['newest_end'] = game_end
+                    self.dirty = True
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Append-only segmented store for match-v5 payloads.
+
+Matches are appended to cache/match_log/segment_<n>.log as encoded records
+(cache_codec.encode), and every append adds one "match_id segment offset
+length" line to index.log. A lookup is a dictionary hit plus one positioned
+read, instead of one file per match. Once cache/match_log/ exists,
+RiotAPIClient.get_match_details reads from and appends to it.
+
+Usage:
+    python match_log.py import [--remove]    # copy cache/match_*.json into the log
+    python match_log.py stats                # entries, segments and garbage
+    python match_log.py compact              # rewrite segments without garbage now
+"""
+
+import argparse
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from cache_codec import GZIP_MAGIC, atomic_write, decode, encode, file_lock
+from metrics import metrics
+
+
+LOG_DIR = 'match_log'
+SEGMENT_BYTES = 64 * 1024 * 1024
+# Share of segment bytes that are garbage (deleted or orphaned records) before compacting in the background
+COMPACT_RATIO = 0.3
+TOMBSTONE = '-'
+
+SEGMENT_NAME = re.compile(r'^segment_(\d+)\.log$')
+
+
+class MatchLog:
+    """
+    Segmented, append-only match store with a match ID -> (segment, offset, length) index.
+
+    Appends take a file lock, so several crawler processes can share one log;
+    each process picks up the others' appends by reading new index.log lines.
+    Records are never modified in place. delete() appends a tombstone, and
+    compact() copies the live records into new segments in the background,
+    then swaps in a rewritten index.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = 'cache'):
+        self.log_dir = Path(cache_dir) / LOG_DIR
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.log_dir / 'index.log'
+        self.entries: Dict[str, Tuple[int, int, int]] = {}
+        self._index_pos = 0
+        self._index_ino = None
+        self._fds: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._refresh_index()
+
+    @staticmethod
+    def exists(cache_dir: Union[str, Path] = 'cache') -> bool:
+        return (Path(cache_dir) / LOG_DIR / 'index.log').exists()
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            return match_id in self.entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    def match_ids(self) -> List[str]:
+        with self._lock:
+            self._refresh_index()
+            return list(self.entries)
+
+    def close(self):
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds = {}
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.log_dir / f"segment_{segment:06d}.log"
+
+    def _segments(self) -> List[int]:
+        return sorted(int(match.group(1)) for match in
+                      (SEGMENT_NAME.match(path.name) for path in self.log_dir.iterdir()) if match)
+
+    def _refresh_index(self):
+        """Apply index lines appended since the last call (by any process); reread everything after a compaction"""
+        try:
+            stat = self.index_file.stat()
+        except FileNotFoundError:
+            return
+
+        if stat.st_ino != self._index_ino or stat.st_size < self._index_pos:
+            self.entries = {}
+            self._index_pos = 0
+            self._index_ino = stat.st_ino
+        if stat.st_size == self._index_pos:
+            return
+
+        with open(self.index_file, 'rb') as f:
+            f.seek(self._index_pos)
+            chunk = f.read()
+        # A line without its newline is still being written (or was torn by a crash): leave it for later
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].decode('utf-8', errors='replace').splitlines():
+            parts = line.split()
+            if len(parts) != 4:
+                continue
+            match_id, segment, offset, length = parts
+            if segment == TOMBSTONE:
+                self.entries.pop(match_id, None)
+            elif segment.isdigit() and offset.isdigit() and length.isdigit():
+                self.entries[match_id] = (int(segment), int(offset), int(length))
+        self._index_pos += end
+
+    def _append_index(self, lines: List[str]):
+        with open(self.index_file, 'ab') as f:
+            # Terminate a line torn by a crashed writer so ours is not glued onto it
+            if f.tell() > 0:
+                with open(self.index_file, 'rb') as check:
+                    check.seek(-1, os.SEEK_END)
+                    if check.read(1) != b'\n':
+                        f.write(b'\n')
+            f.write(''.join(lines).encode('utf-8'))
+
+    def _read(self, segment: int, offset: int, length: int) -> bytes:
+        fd = self._fds.get(segment)
+        if fd is None:
+            fd = os.open(self._segment_path(segment), os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            self._fds[segment] = fd
+        if hasattr(os, 'pread'):
+            return os.pread(fd, length, offset)
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, length)
+
+    def read_raw(self, match_id: str) -> Optional[bytes]:
+        """The encoded record of a match, or None if it is not in the log"""
+        with self._lock:
+            entry = self.entries.get(match_id)
+            if entry is None:
+                self._refresh_index()
+                entry = self.entries.get(match_id)
+            if entry is None:
+                return None
+            try:
+                raw = self._read(*entry)
+            except FileNotFoundError:
+                # Compacted away by another process since we read the index
+                self._refresh_index()
+                entry = self.entries.get(match_id)
+                if entry is None:
+                    return None
+                raw = self._read(*entry)
+        metrics.inc('cache_bytes_read_total', len(raw), type='match_log')
+        return raw
+
+    def get(self, match_id: str) -> Optional[Dict]:
+        raw = self.read_raw(match_id)
+        if raw is None:
+            return None
+        try:
+            return decode(raw)
+        except (ValueError, EOFError, OSError, zlib.error):
+            # Damaged record: forget it so the match is fetched again
+            self.delete(match_id)
+            return None
+
+    def append(self, match_id: str, match_data: Dict) -> bool:
+        """Store a match; False if it was already in the log"""
+        return self.append_records([(match_id, encode(match_data))]) == 1
+
+    def append_records(self, records: Iterable[Tuple[str, bytes]]) -> int:
+        """Append already-encoded records in one locked batch; returns how many were new"""
+        added = 0
+        with self._lock, file_lock(self.index_file):
+            self._refresh_index()
+            segments = self._segments()
+            segment = segments[-1] if segments else 1
+            lines = []
+            f = open(self._segment_path(segment), 'ab')
+            try:
+                for match_id, raw in records:
+                    if match_id in self.entries:
+                        continue
+                    if f.tell() + len(raw) > SEGMENT_BYTES and f.tell() > 0:
+                        f.close()
+                        segment += 1
+                        f = open(self._segment_path(segment), 'ab')
+                    offset = f.tell()
+                    f.write(raw)
+                    self.entries[match_id] = (segment, offset, len(raw))
+                    lines.append(f"{match_id} {segment} {offset} {len(raw)}\n")
+                    added += 1
+            finally:
+                # Records reach the segment before the index points at them
+                f.close()
+                if lines:
+                    self._append_index(lines)
+        return added
+
+    def delete(self, match_id: str):
+        with self._lock, file_lock(self.index_file):
+            self._refresh_index()
+            if self.entries.pop(match_id, None) is not None:
+                self._append_index([f"{match_id} {TOMBSTONE} 0 0\n"])
+        self.maybe_compact()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh_index()
+            segments = self._segments()
+            sizes = {segment: self._segment_path(segment).stat().st_size for segment in segments}
+            live_bytes = sum(length for _, _, length in self.entries.values())
+        total = sum(sizes.values())
+        return {
+            'entries': len(self.entries),
+            'segments': len(segments),
+            'bytes': total,
+            'live_bytes': live_bytes,
+            'garbage_ratio': (total - live_bytes) / total if total else 0.0
+        }
+
+    def maybe_compact(self) -> bool:
+        """Start a background compaction if enough of the log is garbage"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return False
+        if self.stats()['garbage_ratio'] < COMPACT_RATIO:
+            return False
+        self._compactor = threading.Thread(target=self.compact, args=(COMPACT_RATIO,),
+                                           name='match-log-compact', daemon=True)
+        self._compactor.start()
+        return True
+
+    def compact(self, min_ratio: float = 0.0) -> int:
+        """
+        Copy the live records of every segment into new segments and delete the
+        old ones; returns the bytes reclaimed. An empty segment is started
+        first, so the old ones stop changing and the copy runs without the
+        lock; only the index swap at the end blocks appenders. Compactions
+        from several threads or processes run one at a time.
+        """
+        with file_lock(self.log_dir / 'compact'):
+            with self._lock, file_lock(self.index_file):
+                self._refresh_index()
+                segments = self._segments()
+                total = sum(self._segment_path(segment).stat().st_size for segment in segments)
+                garbage = total - sum(length for _, _, length in self.entries.values())
+                if not garbage or garbage / total < min_ratio:
+                    return 0
+                old = set(segments)
+                moving = dict(self.entries)
+                # Appends from here on go to the new segment, which this compaction leaves alone
+                fresh = self._segment_path(segments[-1] + 1)
+                fresh.touch()
+
+            moved: Dict[str, Tuple[int, int, int]] = {}
+            temp_paths = [self.log_dir / f".compact_{os.getpid()}_0.tmp"]
+            out = open(temp_paths[0], 'wb')
+            try:
+                for match_id, (segment, offset, length) in sorted(moving.items(), key=lambda item: item[1]):
+                    with self._lock:
+                        raw = self._read(segment, offset, length)
+                    if out.tell() + length > SEGMENT_BYTES and out.tell() > 0:
+                        out.close()
+                        temp_paths.append(self.log_dir / f".compact_{os.getpid()}_{len(temp_paths)}.tmp")
+                        out = open(temp_paths[-1], 'wb')
+                    # Segment numbers are assigned at the swap; keep the position within the copy for now
+                    moved[match_id] = (len(temp_paths) - 1, out.tell(), length)
+                    out.write(raw)
+            finally:
+                out.close()
+
+            with self._lock, file_lock(self.index_file):
+                self._refresh_index()
+                # Copies are numbered above every segment, so appends move on to the last of them
+                first = self._segments()[-1] + 1
+                for number, path in enumerate(temp_paths):
+                    os.replace(path, self._segment_path(first + number))
+                # Entries deleted or re-pointed since the copy keep their current state
+                for match_id, (number, offset, length) in moved.items():
+                    if self.entries.get(match_id) == moving[match_id]:
+                        self.entries[match_id] = (first + number, offset, length)
+                atomic_write(self.index_file, ''.join(
+                    f"{match_id} {segment} {offset} {length}\n"
+                    for match_id, (segment, offset, length) in self.entries.items()
+                ).encode('utf-8'))
+                self._index_ino = self.index_file.stat().st_ino
+                self._index_pos = self.index_file.stat().st_size
+
+                if fresh.stat().st_size == 0:
+                    old.add(segments[-1] + 1)
+                reclaimed = 0
+                for segment in old:
+                    path = self._segment_path(segment)
+                    reclaimed += path.stat().st_size
+                    fd = self._fds.pop(segment, None)
+                    if fd is not None:
+                        os.close(fd)
+                    path.unlink()
+        return reclaimed - sum(entry[2] for entry in moved.values())
+
+    def import_files(self, cache_dir: Union[str, Path] = 'cache', remove: bool = False,
+                     batch: int = 500) -> int:
+        """Append every cache/match_*.json not in the log yet; returns how many were added"""
+        paths = sorted(Path(cache_dir).glob('match_*.json'))
+        added = 0
+        for start in range(0, len(paths), batch):
+            records = []
+            for path in paths[start:start + batch]:
+                match_id = path.stem[len('match_'):]
+                if match_id in self:
+                    continue
+                try:
+                    raw = path.read_bytes()
+                    match_data = decode(raw)
+                except (OSError, ValueError, EOFError, zlib.error):
+                    continue
+                # Keep already compressed files byte for byte, compact the old plain ones
+                records.append((match_id, raw if raw[:2] == GZIP_MAGIC else encode(match_data)))
+            added += self.append_records(records)
+
+            if remove:
+                for path in paths[start:start + batch]:
+                    if path.stem[len('match_'):] in self:
+                        path.unlink()
+        return added
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+        """(match ID, match data) for every live record"""
+        for match_id in self.match_ids():
+            match_data = self.get(match_id)
+            if match_data is not None:
+                yield match_id, match_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=('import', 'stats', 'compact'))
+    parser.add_argument('--cache-dir', default='cache')
+    parser.add_argument('--remove', action='store_true', help='delete match files once they are in the log')
+    args = parser.parse_args()
+
+    log = MatchLog(args.cache_dir)
+    if args.command == 'import':
+        added = log.import_files(args.cache_dir, remove=args.remove)
+        print(f"✅ Imported {added} matches ({len(log)} in the log)")
+    elif args.command == 'compact':
+        reclaimed = log.compact()
+        print(f"🧹 Reclaimed {reclaimed / 1024 / 1024:.1f} MB")
+
+    stats = log.stats()
+    print(f"📦 {stats['entries']} matches in {stats['segments']} segments, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB ({stats['garbage_ratio'] * 100:.0f}% garbage)")
+    log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+class MatchFetchPipeline:
+    """
+    Concurrent match crawl over a list of players.
+
+    Match ID lists and match details are fetched on two bounded thread pools and
+    yielded as soon as each match arrives, so aggregation never waits on the
+    slowest request. All requests go through the client's rate limiter.
+
+    Use as a context manager: leaving the block (e.g. once enough games are
+    found) cancels queued work, wakes workers waiting on the rate budget and
+    waits for requests already sent, so nothing writes to the cache afterwards.
+    """
+
+    def __init__(self, client, puuids: List[str], ids_per_player: int = 10,
+                 seen_matches: Set[str] = None, max_workers: int = 8):
+        self.client = client
+        self.puuids = [puuid for puuid in puuids if puuid]
+        self.ids_per_player = ids_per_player
+        self.seen_matches = seen_matches if seen_matches is not None else set()
+        self.max_workers = max(1, max_workers)
+        self.id_workers = max(1, self.max_workers // 4)
+
+        self.players_checked = 0
+        self.matches_fetched = 0
+
+        self._stop = threading.Event()
+        self._ids_pool = ThreadPoolExecutor(self.id_workers, thread_name_prefix='match-ids')
+        self._details_pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='match-details')
+        self._id_futures: Dict[Future, str] = {}
+        self._detail_futures: Dict[Future, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+        return self.run()
+
+    def _fetch_match_ids(self, puuid: str) -> List[str]:
+        if self._stop.is_set():
+            return []
+        return self.client.get_recent_match_ids(puuid, self.ids_per_player, cancel=self._stop)
+
+    def _fetch_match_details(self, match_id: str) -> Optional[Dict]:
+        if self._stop.is_set():
+            return None
+        return self.client.get_match_details(match_id, cancel=self._stop)
+
+    def _submit_players(self, players):
+        # Only look up more players while the detail queue is short, so ID requests
+        # don't run far ahead of the matches we will actually read
+        while (len(self._id_futures) < self.id_workers
+               and len(self._detail_futures) < self.max_workers * 2):
+            puuid = next(players, None)
+            if puuid is None:
+                return
+            self._id_futures[self._ids_pool.submit(self._fetch_match_ids, puuid)] = puuid
+
+    def run(self) -> Iterator[Tuple[str, Dict]]:
+        players = iter(self.puuids)
+
+        while not self._stop.is_set():
+            self._submit_players(players)
+            pending = set(self._id_futures) | set(self._detail_futures)
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    self._id_futures.pop(future, None)
+                    self._detail_futures.pop(future, None)
+                    continue
+                if future in self._id_futures:
+                    del self._id_futures[future]
+                    self.players_checked += 1
+                    if self._stop.is_set():
+                        continue
+                    for match_id in future.result():
+                        # Skip matches already queued from another player's history
+                        if match_id in self.seen_matches:
+                            continue
+                        self.seen_matches.add(match_id)
+                        detail_future = self._details_pool.submit(self._fetch_match_details, match_id)
+                        self._detail_futures[detail_future] = match_id
+                else:
+                    match_id = self._detail_futures.pop(future)
+                    match_data = future.result()
+                    if not match_data:
+                        # Let another player's history retry it
+                        self.seen_matches.discard(match_id)
+                        continue
+                    self.matches_fetched += 1
+                    yield match_id, match_data
+
+    def stop(self):
+        """Ask run() to return once the requests already running finish; safe from any thread"""
+        self._stop.set()
+
+    def close(self):
+        """Stop and wait for the workers; call from the thread iterating run(), or after it has returned"""
+        self.stop()
+        for future in list(self._id_futures) + list(self._detail_futures):
+            future.cancel()
+        # Workers see _stop between requests; wait for the ones mid-request to store their match
+        self._ids_pool.shutdown(wait=True, cancel_futures=True)
+        self._details_pool.shutdown(wait=True, cancel_futures=True)
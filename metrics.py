@@ -0,0 +1,169 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+
+# Upper bounds in seconds, shared by request latencies and phase timings
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'http_request_seconds': 'Latency of HTTP requests per API and endpoint',
+    'http_requests_total': 'HTTP requests per API, endpoint and status (or failure kind)',
+    'rate_limit_wait_seconds_total': 'Time requests spent waiting for rate budget, per priority',
+    'retry_backoff_seconds_total': 'Time spent backing off before retries',
+    'cache_lookups_total': 'Cache lookups per cache file type and result (hit/miss)',
+    'cache_bytes_read_total': 'Bytes read from cache files, per cache file type',
+    'cache_corrupt_total': 'Corrupt cache files moved to quarantine, per cache file type',
+    'phase_seconds': 'Duration of pipeline phases',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def cache_type(path: Union[str, Path]) -> str:
+    """Cache file type from its name: match_EUW1_1.json -> match, items.json -> items"""
+    return Path(path).stem.split('_')[0]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, observations <= bound) pairs ending with +Inf, as Prometheus expects"""
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            result.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return result
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency histograms for the build pipeline.
+
+    RiotAPIClient, DataDragonClient, BuildGenerator, the request scheduler and
+    the cache codec record into the shared `metrics` registry; dump() writes it
+    as JSON or Prometheus text to see where a run's time went.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted((label, str(v)) for label, v in labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted((label, str(v)) for label, v in labels.items()))
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str = 'phase_seconds', **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_cache(self, path: Union[str, Path], hit: bool):
+        self.inc('cache_lookups_total', type=cache_type(path), result='hit' if hit else 'miss')
+
+    def cache_hit_ratios(self) -> Dict[str, float]:
+        lookups: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for key, value in self.counters.get('cache_lookups_total', {}).items():
+                labels = dict(key)
+                lookups.setdefault(labels['type'], {'hit': 0, 'miss': 0})[labels['result']] += value
+        return {kind: counts['hit'] / (counts['hit'] + counts['miss']) for kind, counts in lookups.items()}
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            data = {
+                'counters': {
+                    name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+                'histograms': {
+                    name: [
+                        {
+                            'labels': dict(key),
+                            'count': histogram.count,
+                            'sum': histogram.sum,
+                            'buckets': dict(histogram.cumulative())
+                        }
+                        for key, histogram in series.items()
+                    ]
+                    for name, series in self.histograms.items()
+                }
+            }
+        data['cache_hit_ratio'] = self.cache_hit_ratios()
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        def label_text(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{label}="{value}"' for label, value in pairs) + '}'
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{label_text(key)} {format_number(value)}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{name}_bucket{label_text(key, (('le', bound),))} {count}")
+                    lines.append(f"{name}_sum{label_text(key)} {format_number(histogram.sum)}")
+                    lines.append(f"{name}_count{label_text(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: Union[str, Path]):
+        """Write the registry to path: Prometheus text for .prom/.txt, JSON otherwise"""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix in ('.prom', '.txt') else self.to_json()
+        path.write_text(text)
+
+
+# Process-wide registry every component records into
+metrics = MetricsRegistry()
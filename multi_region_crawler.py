@@ -0,0 +1,113 @@
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from match_pipeline import MatchFetchPipeline
+from request_scheduler import BACKGROUND
+from riot_api_client import RiotAPIClient
+
+
+class MultiRegionPipeline:
+    """
+    Several per-region MatchFetchPipelines merged into one match stream.
+
+    Each region's pipeline runs on its own thread and hands matches to a shared
+    queue, so a slow or throttled region never holds back the others. Exposes
+    the same interface as MatchFetchPipeline (iteration, players_checked,
+    matches_fetched, context manager).
+    """
+
+    def __init__(self, pipelines: Dict[str, MatchFetchPipeline]):
+        self.pipelines = pipelines
+        self.puuids = [puuid for pipeline in pipelines.values() for puuid in pipeline.puuids]
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def players_checked(self) -> int:
+        return sum(pipeline.players_checked for pipeline in self.pipelines.values())
+
+    @property
+    def matches_fetched(self) -> int:
+        return sum(pipeline.matches_fetched for pipeline in self.pipelines.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+        return self.run()
+
+    def _drain(self, pipeline: MatchFetchPipeline):
+        try:
+            for item in pipeline:
+                self._queue.put(item)
+        finally:
+            self._queue.put(None)
+
+    def run(self) -> Iterator[Tuple[str, Dict]]:
+        for region, pipeline in self.pipelines.items():
+            thread = threading.Thread(target=self._drain, args=(pipeline,),
+                                      name=f'crawl-{region}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        running = len(self._threads)
+        while running:
+            item = self._queue.get()
+            if item is None:
+                running -= 1
+                continue
+            yield item
+
+    def close(self):
+        # Each pipeline is iterated by its drain thread: let those return before shutting the pools down
+        for pipeline in self.pipelines.values():
+            pipeline.stop()
+        for thread in self._threads:
+            thread.join()
+        for pipeline in self.pipelines.values():
+            pipeline.close()
+
+
+class MultiRegionCrawler(RiotAPIClient):
+    """
+    RiotAPIClient that crawls several platforms at once and merges them into one aggregate.
+
+    All region clients share one scheduler; its rate limiter keys buckets by host,
+    so every platform (euw1, na1, kr...) and regional route (europe, americas,
+    asia) keeps its own budget, while platforms on the same route (euw1 and eun1)
+    correctly share the route's match-v5 budget. They also share the match cache
+    and its indexes, so the merged corpus lives in one cache/ directory.
+    """
+
+    def __init__(self, regions: List[str] = None, api_key: str = None, cache_dir: str = 'cache',
+                 max_workers: int = 8, priority: int = BACKGROUND):
+        regions = regions or list(self.BASE_URLS)
+        super().__init__(api_key=api_key, region=regions[0], cache_dir=cache_dir,
+                         max_workers=max_workers, priority=priority)
+
+        self.clients: Dict[str, RiotAPIClient] = {regions[0]: self}
+        for region in regions[1:]:
+            self.clients[region] = RiotAPIClient(
+                api_key=self.api_key, region=region, cache_dir=cache_dir,
+                scheduler=self.scheduler, priority=priority, session=self.session, max_workers=max_workers,
+                build_index=self.build_index, match_id_index=self.match_id_index,
+                negative_cache=self.negative_cache, match_log=self.match_log
+            )
+
+    def _open_pipeline(self, max_players: int = 100) -> Optional[MultiRegionPipeline]:
+        """One pipeline per region over that region's top max_players players"""
+        pipelines = {}
+        for region, client in self.clients.items():
+            print(f"  🌍 {region.upper()}")
+            pipeline = RiotAPIClient._open_pipeline(client, max_players)
+            if pipeline is not None:
+                pipelines[region] = pipeline
+
+        if not pipelines:
+            return None
+        return MultiRegionPipeline(pipelines)
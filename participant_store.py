@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Compact columnar store of the participant fields the build analysis reads.
+
+Usage:
+    python participant_store.py ingest           # add new cache/match_*.json files
+    python participant_store.py stats [ROLE]     # games and winrate per champion
+    python participant_store.py build CHAMPION [ROLE]
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cache_codec import read_cached
+from build_stats import add_participant, new_builds_data, normalize_role, summarize_builds, walk_new_matches
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    game_end INTEGER
+);
+CREATE TABLE IF NOT EXISTS participants (
+    match_id TEXT NOT NULL,
+    champion TEXT NOT NULL,
+    position TEXT NOT NULL,
+    win INTEGER NOT NULL,
+    item0 INTEGER, item1 INTEGER, item2 INTEGER,
+    item3 INTEGER, item4 INTEGER, item5 INTEGER,
+    primary_style INTEGER,
+    keystone INTEGER,
+    secondary_style INTEGER,
+    summoner1 INTEGER,
+    summoner2 INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_participants_champion
+    ON participants (champion COLLATE NOCASE, position);
+"""
+
+COLUMNS = (
+    'match_id', 'champion', 'position', 'win',
+    'item0', 'item1', 'item2', 'item3', 'item4', 'item5',
+    'primary_style', 'keystone', 'secondary_style', 'summoner1', 'summoner2'
+)
+
+
+def extract_rows(match_id: str, match_data: Dict) -> List[Tuple]:
+    """Pull the ~15 columns the analysis uses out of a match-v5 payload, one row per participant"""
+    rows = []
+    for participant in match_data['info']['participants']:
+        styles = participant.get('perks', {}).get('styles', [])
+        primary_style = keystone = secondary_style = None
+        if len(styles) >= 2:
+            primary_style = styles[0].get('style')
+            keystone = styles[0].get('selections', [{}])[0].get('perk')
+            secondary_style = styles[1].get('style')
+
+        rows.append((
+            match_id,
+            participant['championName'],
+            participant.get('teamPosition', '').upper(),
+            1 if participant['win'] else 0,
+            *(participant.get(f'item{i}', 0) for i in range(6)),
+            primary_style, keystone, secondary_style,
+            participant.get('summoner1Id'), participant.get('summoner2Id')
+        ))
+    return rows
+
+
+def extract_match_files(paths: List[str]) -> List[Tuple[str, int, List[Tuple]]]:
+    """Parse one chunk of cached match files (runs inside a worker process)"""
+    results = []
+    for path in paths:
+        try:
+            # Corrupt files (e.g. truncated gzip) are quarantined and refetched, not counted
+            match_data = read_cached(path)
+        except OSError:
+            continue
+        if match_data is None:
+            continue
+
+        match_id = Path(path).stem[len('match_'):]
+        game_end = match_data['info'].get('gameEndTimestamp')
+        results.append((match_id, game_end, extract_rows(match_id, match_data)))
+    return results
+
+
+def row_to_participant(row: sqlite3.Row) -> Dict:
+    """Rebuild the participant shape that build_stats.add_participant expects"""
+    participant = {f'item{i}': row[f'item{i}'] or 0 for i in range(6)}
+    participant['win'] = bool(row['win'])
+    participant['summoner1Id'] = row['summoner1']
+    participant['summoner2Id'] = row['summoner2']
+    if row['primary_style'] is not None:
+        participant['perks'] = {'styles': [
+            {'style': row['primary_style'], 'selections': [{'perk': row['keystone']}]},
+            {'style': row['secondary_style']}
+        ]}
+    return participant
+
+
+class ParticipantStore:
+    """
+    SQLite table with one row per participant and only the columns the build
+    analysis reads (championName, teamPosition, win, item0-5, rune styles and
+    keystone, summoner spells). A few MB instead of ~110 KB of JSON per match.
+    """
+
+    def __init__(self, cache_dir: str = 'cache'):
+        self.cache_dir = Path(cache_dir)
+        self.db_file = self.cache_dir / 'participants.sqlite3'
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def known_match_ids(self) -> set:
+        with self._lock:
+            return {row[0] for row in self.conn.execute('SELECT match_id FROM matches')}
+
+    def _insert(self, match_id: str, game_end: Optional[int], rows: List[Tuple]) -> bool:
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO matches (match_id, game_end) VALUES (?, ?)', (match_id, game_end)
+        )
+        if cursor.rowcount == 0:
+            return False
+        placeholders = ', '.join('?' * len(COLUMNS))
+        self.conn.executemany(
+            f"INSERT INTO participants ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows
+        )
+        return True
+
+    def ingest_cache(self, workers: int = None) -> int:
+        """Ingest cached matches (files and match log records) not in the store yet; returns how many were added"""
+        logged, results = walk_new_matches(self.cache_dir, self.known_match_ids(), extract_match_files, workers)
+
+        added = 0
+        with self._lock, self.conn:
+            for match_id, match_data in logged:
+                rows = extract_rows(match_id, match_data)
+                if self._insert(match_id, match_data['info'].get('gameEndTimestamp'), rows):
+                    added += 1
+            for chunk in results:
+                for match_id, game_end, rows in chunk:
+                    if self._insert(match_id, game_end, rows):
+                        added += 1
+        return added
+
+    def aggregate(self, champion_name: str, role: str = None) -> Dict:
+        """Same builds_data as the JSON path, computed from the stored columns"""
+        api_role = normalize_role(role)
+        query = f"SELECT {', '.join(COLUMNS)} FROM participants WHERE champion = ? COLLATE NOCASE"
+        params = [champion_name]
+        if api_role:
+            query += ' AND position = ?'
+            params.append(api_role)
+
+        builds_data = new_builds_data()
+        with self._lock:
+            for row in self.conn.execute(query, params):
+                add_participant(builds_data, row_to_participant(row))
+        return builds_data
+
+    def champion_stats(self, role: str = None) -> List[Dict]:
+        """Games and winrate per champion (and position), most played first"""
+        api_role = normalize_role(role)
+        query = 'SELECT champion, position, COUNT(*) AS games, SUM(win) AS wins FROM participants'
+        params = []
+        if api_role:
+            query += ' WHERE position = ?'
+            params.append(api_role)
+        query += ' GROUP BY champion, position ORDER BY games DESC'
+
+        with self._lock:
+            return [
+                {
+                    'champion': row['champion'],
+                    'position': row['position'] or 'Any',
+                    'games': row['games'],
+                    'winrate': row['wins'] / row['games'] * 100
+                }
+                for row in self.conn.execute(query, params)
+            ]
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('ingest', 'stats', 'build'):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    store = ParticipantStore()
+    command = sys.argv[1]
+
+    if command == 'ingest':
+        added = store.ingest_cache()
+        size = store.db_file.stat().st_size / 1024 / 1024
+        print(f"✅ Ingested {added} new matches ({len(store.known_match_ids())} total, {size:.1f} MB)")
+    elif command == 'stats':
+        role = sys.argv[2] if len(sys.argv) > 2 else None
+        for stat in store.champion_stats(role)[:30]:
+            print(f"  {stat['champion']:<15} {stat['position']:<8} {stat['games']:>5} games  {stat['winrate']:.1f}% WR")
+    elif command == 'build':
+        if len(sys.argv) < 3:
+            print(__doc__.strip())
+            sys.exit(1)
+        champion = sys.argv[2]
+        role = sys.argv[3] if len(sys.argv) > 3 else None
+        builds_data = store.aggregate(champion, role)
+        if builds_data['total_games'] == 0:
+            print(f"❌ No games found for {champion} ({role or 'any role'})")
+        else:
+            print(json.dumps(summarize_builds(builds_data, champion, role), indent=2))
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -90,8 +90,13 @@ show_menu() {
         5)
             echo ""
             if [ -d "cache" ]; then
-                read -p "⚠️  Delete all cache? [y/N]: " confirm
-                if [ "$confirm" = "y" ] || [ "$confirm" = "Y" ]; then
+                source .venv/bin/activate
+                python cache_manager.py report
+                echo ""
+                read -p "🧹 Trim to budget [t], delete all cache [d], cancel [N]: " confirm
+                if [ "$confirm" = "t" ] || [ "$confirm" = "T" ]; then
+                    python cache_manager.py gc
+                elif [ "$confirm" = "d" ] || [ "$confirm" = "D" ]; then
                     rm -rf cache
                     echo "✅ Cache deleted"
                 else
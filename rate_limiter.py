@@ -0,0 +1,180 @@
+import math
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_rate_limits(header: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse a Riot limit header like '20:1,100:120' into (count, window_seconds) pairs"""
+    limits = []
+    if not header:
+        return limits
+
+    for part in header.split(','):
+        try:
+            count, window = part.strip().split(':')
+            limits.append((int(count), int(window)))
+        except ValueError:
+            continue
+
+    return limits
+
+
+def parse_retry_after(header: Optional[str], default: float = 10) -> float:
+    """Seconds to wait from a Retry-After header: delta seconds ('5', '1.5') or an HTTP-date"""
+    if not header:
+        return default
+    try:
+        seconds = float(header)
+    except ValueError:
+        pass
+    else:
+        return max(0.0, seconds) if math.isfinite(seconds) else default
+    try:
+        retry_at = parsedate_to_datetime(header)
+    except (TypeError, ValueError, IndexError):
+        return default
+    if retry_at is None:
+        return default
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimitBucket:
+    """Sliding-window log of requests sent against one set of Riot limits"""
+
+    def __init__(self, limits: List[Tuple[int, int]] = None, window_padding: float = 0.1):
+        self.window_padding = window_padding
+        self.limits: Dict[int, int] = {}
+        self.sent: Dict[int, deque] = {}
+        self.blocked_until = 0.0
+        if limits:
+            self.set_limits(limits)
+
+    def set_limits(self, limits: List[Tuple[int, int]]):
+        self.limits = {window: count for count, window in limits}
+        for window in self.limits:
+            self.sent.setdefault(window, deque())
+
+    def _trim(self, now: float):
+        for window, sent in self.sent.items():
+            horizon = now - window - self.window_padding
+            while sent and sent[0] <= horizon:
+                sent.popleft()
+
+    def wait_time(self, now: float, share: float = 1.0) -> float:
+        """Seconds until one more request fits, using only `share` of each window's limit"""
+        self._trim(now)
+        wait = max(0.0, self.blocked_until - now)
+
+        for window, limit in self.limits.items():
+            count = max(1, int(limit * share))
+            sent = self.sent[window]
+            if len(sent) >= count:
+                # The oldest request that still counts must leave the window first
+                oldest = sent[len(sent) - count]
+                wait = max(wait, oldest + window + self.window_padding - now)
+
+        return wait
+
+    def record(self, now: float):
+        for sent in self.sent.values():
+            sent.append(now)
+
+    def sync_counts(self, counts: List[Tuple[int, int]], now: float):
+        """Trust the server when it has seen more requests than we logged (other processes, restarts)"""
+        self._trim(now)
+        for count, window in counts:
+            sent = self.sent.get(window)
+            if sent is None:
+                continue
+            missing = count - len(sent)
+            if missing > 0:
+                sent.extend([now] * missing)
+
+    def usage(self) -> Dict[int, Tuple[int, int]]:
+        self._trim(time.monotonic())
+        return {window: (len(self.sent[window]), count) for window, count in self.limits.items()}
+
+
+class RateLimiter:
+    """
+    Client-side Riot API rate limiter.
+
+    Keeps one application bucket per routing host and one method bucket per
+    (host, method). Limits and counts are learned from the X-App-Rate-Limit* and
+    X-Method-Rate-Limit* response headers, so requests go out as fast as the
+    budget allows instead of waiting on a fixed delay or a 429. Waiting for
+    budget is RequestScheduler's job; it claims requests through try_acquire().
+    """
+
+    # Development key limits, used until the first response tells us the real ones
+    DEFAULT_APP_LIMITS = [(20, 1), (100, 120)]
+
+    def __init__(self, app_limits: List[Tuple[int, int]] = None, window_padding: float = 0.1):
+        self.app_limits = app_limits or self.DEFAULT_APP_LIMITS
+        self.window_padding = window_padding
+        self.app_buckets: Dict[str, RateLimitBucket] = {}
+        self.method_buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+        self._lock = threading.Lock()
+
+    def _buckets(self, host: str, method: str) -> Tuple[RateLimitBucket, RateLimitBucket]:
+        app = self.app_buckets.get(host)
+        if app is None:
+            app = self.app_buckets[host] = RateLimitBucket(self.app_limits, self.window_padding)
+
+        key = (host, method)
+        meth = self.method_buckets.get(key)
+        if meth is None:
+            meth = self.method_buckets[key] = RateLimitBucket(window_padding=self.window_padding)
+
+        return app, meth
+
+    def try_acquire(self, host: str, method: str, share: float = 1.0) -> float:
+        """
+        Claim one request if the budgets allow it and return 0, else return the wait in seconds.
+        `share` caps how much of the app budget this request may use (the rest stays free).
+        """
+        with self._lock:
+            now = time.monotonic()
+            app, meth = self._buckets(host, method)
+            wait = max(app.wait_time(now, share), meth.wait_time(now))
+            if wait <= 0:
+                app.record(now)
+                meth.record(now)
+                return 0.0
+            return wait
+
+    def update(self, host: str, method: str, headers):
+        """Learn limits and server-side counts from a Riot response"""
+        with self._lock:
+            now = time.monotonic()
+            app, meth = self._buckets(host, method)
+
+            app_limits = parse_rate_limits(headers.get('X-App-Rate-Limit'))
+            if app_limits:
+                app.set_limits(app_limits)
+            app.sync_counts(parse_rate_limits(headers.get('X-App-Rate-Limit-Count')), now)
+
+            method_limits = parse_rate_limits(headers.get('X-Method-Rate-Limit'))
+            if method_limits:
+                meth.set_limits(method_limits)
+            meth.sync_counts(parse_rate_limits(headers.get('X-Method-Rate-Limit-Count')), now)
+
+    def penalize(self, host: str, method: str, retry_after: float, limit_type: str = None):
+        """Hold back the bucket a 429 was charged to for Retry-After seconds"""
+        with self._lock:
+            now = time.monotonic()
+            app, meth = self._buckets(host, method)
+            bucket = app if limit_type == 'application' else meth
+            bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+
+    def usage(self) -> Dict[str, Dict]:
+        """Requests used vs allowed per window, for each host's app budget and each method budget"""
+        with self._lock:
+            return {
+                'app': {host: bucket.usage() for host, bucket in self.app_buckets.items()},
+                'methods': {f"{host} {method}": bucket.usage()
+                            for (host, method), bucket in self.method_buckets.items()}
+            }
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from api_errors import CANCELLED
+from cache_codec import atomic_write, file_lock, read_cached
+
+
+# How long a failed lookup is remembered, by HTTP status (seconds)
+NEGATIVE_TTLS = {
+    404: 7 * 86400,   # match or summoner does not exist
+    400: 86400,       # malformed ID, retrying will not help
+    401: 60,          # key problems are fixed by the user, retry soon
+    403: 60,
+}
+# 429 after retries, 5xx, timeouts and connection errors (recorded by error kind)
+TRANSIENT_TTL = 300
+
+
+def request_key(url: str, params: Dict = None) -> str:
+    if not params:
+        return url
+    query = '&'.join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{url}?{query}"
+
+
+class NegativeCache:
+    """
+    Remembers failed Riot lookups with a per-status TTL, persisted in
+    cache/negative_cache.json, so a missing match is not requested again on
+    every run.
+    """
+
+    def __init__(self, cache_dir: str = 'cache'):
+        self.cache_dir = Path(cache_dir)
+        self.cache_file = self.cache_dir / 'negative_cache.json'
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.entries = read_cached(self.cache_file) or {}
+
+    def save(self):
+        # Other processes may have saved since we loaded: merge their entries instead of overwriting them
+        with self._lock, file_lock(self.cache_file):
+            now = time.time()
+            for key, entry in (read_cached(self.cache_file) or {}).items():
+                if key not in self.entries or entry['expires'] > self.entries[key]['expires']:
+                    self.entries[key] = entry
+            # Expired entries are dropped on save rather than on every lookup
+            self.entries = {key: entry for key, entry in self.entries.items() if entry['expires'] > now}
+            atomic_write(self.cache_file, json.dumps(self.entries, separators=(',', ':')).encode('utf-8'))
+            self.dirty = False
+
+    def flush(self):
+        if self.dirty:
+            self.save()
+
+    def get(self, key: str) -> Optional[Union[int, str]]:
+        """The status a still-remembered failure ended with, or None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry['expires'] <= time.time():
+                return None
+            return entry['status']
+
+    def record(self, key: str, status: Union[int, str]):
+        ttl = NEGATIVE_TTLS.get(status, TRANSIENT_TTL)
+        with self._lock:
+            self.entries[key] = {'status': status, 'expires': time.time() + ttl}
+            self.dirty = True
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests: the first caller for a key runs the
+    request, later callers wait for it and get the same parsed result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Tuple[Any, Any]]) -> Tuple[Any, Any]:
+        """fn returns (data, error); a leader that was cancelled does not answer for its followers"""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+
+            if leader:
+                try:
+                    call.result = fn()
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+                return call.result
+
+            call.done.wait()
+            error = call.result[1] if call.result is not None else None
+            if call.result is not None and (error is None or error.kind != CANCELLED):
+                return call.result
+
+
+# Shared by every client in the process, so concurrent analyses coalesce too
+shared_in_flight = SingleFlight()
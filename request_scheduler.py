@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from metrics import metrics
+from rate_limiter import RateLimiter
+
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+
+class RequestScheduler:
+    """
+    Hands out the Riot rate budget by priority class.
+
+    Every request waits here before it is sent. While an INTERACTIVE request is
+    waiting for a host, BACKGROUND requests to that host are held back, so a
+    build lookup from the menu jumps ahead of a running crawl. Background work
+    may also only use `background_share` of the app budget, which keeps some
+    headroom free for interactive requests that arrive mid-crawl.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter = None, background_share: float = 0.8):
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.background_share = background_share
+        self._cond = threading.Condition()
+        self._waiting: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._granted: Dict[int, int] = defaultdict(int)
+        self._wait_total: Dict[int, float] = defaultdict(float)
+        self._wait_max: Dict[int, float] = defaultdict(float)
+
+    def _outranked(self, host: str, priority: int) -> bool:
+        return any(count for other, count in self._waiting[host].items() if other < priority)
+
+    def acquire(self, host: str, method: str, priority: int = BACKGROUND,
+                cancel: threading.Event = None) -> bool:
+        """
+        Block until this request may be sent, then claim its budget.
+        Returns False without claiming anything if `cancel` is set while waiting.
+        """
+        share = 1.0 if priority == INTERACTIVE else self.background_share
+        start = time.monotonic()
+
+        with self._cond:
+            self._waiting[host][priority] += 1
+            try:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        return False
+
+                    if self._outranked(host, priority):
+                        wait = None
+                    else:
+                        wait = self.rate_limiter.try_acquire(host, method, share)
+                        if wait <= 0:
+                            waited = time.monotonic() - start
+                            self._granted[priority] += 1
+                            self._wait_total[priority] += waited
+                            self._wait_max[priority] = max(self._wait_max[priority], waited)
+                            metrics.inc('rate_limit_wait_seconds_total', waited, priority=PRIORITY_NAMES[priority])
+                            return True
+
+                    # Poll a cancellable wait; otherwise sleep until the budget frees or we are notified
+                    if cancel is not None:
+                        wait = min(wait, 0.1) if wait is not None else 0.1
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[host][priority] -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """Queue depth, grants and wait time per priority class, plus current budget use"""
+        with self._cond:
+            stats = {}
+            for priority, name in PRIORITY_NAMES.items():
+                granted = self._granted[priority]
+                stats[name] = {
+                    'queued': sum(waiting[priority] for waiting in self._waiting.values()),
+                    'granted': granted,
+                    'avg_wait': self._wait_total[priority] / granted if granted else 0.0,
+                    'max_wait': self._wait_max[priority]
+                }
+        stats['budget'] = self.rate_limiter.usage()
+        return stats
+
+
+_shared_scheduler: Optional[RequestScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Process-wide scheduler, so every client draws on the same Riot budget"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RequestScheduler()
+        return _shared_scheduler
@@ -1,9 +1,28 @@
 import requests
-import json
+import threading
 import time
-from typing import Dict, List, Optional
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlparse
+from rate_limiter import RateLimiter, parse_retry_after
+from request_scheduler import BACKGROUND, RequestScheduler, get_scheduler
+from http_session import get_session
+from match_pipeline import MatchFetchPipeline
+from build_stats import (
+    add_participant, new_builds_data, normalize_role, summarize_builds
+)
+from build_index import BuildIndex
+from match_id_index import MatchIdIndex
+from match_log import MatchLog
+from convergence import ConvergenceTracker
+from cache_codec import read_cached, write_json
+from request_cache import NegativeCache, SingleFlight, request_key, shared_in_flight
+from api_errors import (
+    APIError, CANCELLED, CIRCUIT_OPEN, CONNECTION, HTTP_ERROR, RATE_LIMITED, TIMEOUT
+)
+from circuit_breaker import CircuitBreaker, backoff_delay, shared_breaker
+from metrics import metrics
 
 
 class RiotAPIClient:
@@ -21,14 +40,71 @@ class RiotAPIClient:
         'asia': 'https://asia.api.riotgames.com',
     }
     
-    def __init__(self, api_key: str = None, region: str = 'euw1', cache_dir: str = 'cache'):
+    def __init__(self, api_key: str = None, region: str = 'euw1', cache_dir: str = 'cache',
+                 rate_limiter: RateLimiter = None, session: requests.Session = None, max_workers: int = 8,
+                 build_index: BuildIndex = None, recrawl_interval: int = 600,
+                 match_id_index: MatchIdIndex = None,
+                 scheduler: RequestScheduler = None, priority: int = BACKGROUND,
+                 negative_cache: NegativeCache = None, in_flight: SingleFlight = None,
+                 circuit_breaker: CircuitBreaker = None, match_log: MatchLog = None):
         self.api_key = api_key or self._load_api_key()
         self.region = region
         self.regional_route = self._get_regional_route(region)
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.rate_limit_delay = 0.05
-        
+        # All clients share the process-wide scheduler (and its budget) unless given their own
+        if scheduler is None:
+            scheduler = RequestScheduler(rate_limiter) if rate_limiter else get_scheduler()
+        self.scheduler = scheduler
+        self.rate_limiter = scheduler.rate_limiter
+        self.priority = priority
+        self.session = session or get_session()
+        self.max_workers = max_workers
+        self._build_index = build_index
+        self._match_id_index = match_id_index
+        self._match_log = match_log
+        # Pipeline workers reach the lazy indexes concurrently; each must be created once
+        self._lazy_lock = threading.Lock()
+        self.negative_cache = negative_cache or NegativeCache(self.cache_dir)
+        self._in_flight = in_flight or shared_in_flight
+        self.circuit_breaker = circuit_breaker or shared_breaker
+        self.timeout = 10
+        self.max_retries = 3
+        self.backoff_base = 0.5
+        # Most recent failures, newest last
+        self.errors: Deque[APIError] = deque(maxlen=100)
+        self.error_counts: Counter = Counter()
+        # Players whose history was crawled more recently than this (seconds) are not asked again
+        self.recrawl_interval = recrawl_interval
+        
+    @property
+    def build_index(self) -> BuildIndex:
+        """Persistent build counts, loaded on first use; new matches are folded in as they are fetched"""
+        if self._build_index is None:
+            with self._lazy_lock:
+                if self._build_index is None:
+                    self._build_index = BuildIndex(self.cache_dir)
+        return self._build_index
+    
+    @property
+    def match_id_index(self) -> MatchIdIndex:
+        """Known match IDs per player, so repeat crawls only ask for newer games"""
+        if self._match_id_index is None:
+            with self._lazy_lock:
+                if self._match_id_index is None:
+                    self._match_id_index = MatchIdIndex(self.cache_dir)
+        return self._match_id_index
+    
+    @property
+    def match_log(self) -> Optional[MatchLog]:
+        """Segmented match store, used once cache/match_log exists (see match_log.py import)"""
+        if self._match_log is None and MatchLog.exists(self.cache_dir):
+            with self._lazy_lock:
+                if self._match_log is None:
+                    self._match_log = MatchLog(self.cache_dir)
+                    self._match_log.maybe_compact()
+        return self._match_log
+    
     def _load_api_key(self) -> Optional[str]:
         key_file = Path('riot_api_key.txt')
         if key_file.exists():
@@ -44,97 +120,145 @@ class RiotAPIClient:
             return 'asia'
         return 'americas'
     
-    def _make_request(self, url: str, params: Dict = None) -> Optional[Dict]:
+    def _make_request(self, url: str, params: Dict = None, method: str = 'default',
+                      cancel: threading.Event = None) -> Optional[Dict]:
+        """Riot GET returning the parsed body, or None with the reason appended to self.errors"""
         if not self.api_key:
             return None
         
+        # Lookups that failed recently are not retried until their TTL runs out
+        key = request_key(url, params)
+        if self.negative_cache.get(key) is not None:
+            return None
+        
+        # Concurrent callers for the same URL share one request and one parsed result
+        data, error = self._in_flight.do(key, lambda: self._send_request(url, params, method, cancel))
+        # A cancelled request (crawl already finished) is not a failure
+        if error is not None and error.kind != CANCELLED:
+            self.errors.append(error)
+            self.error_counts[error.kind if error.status is None else f"{error.kind} {error.status}"] += 1
+            if error.kind != CIRCUIT_OPEN:
+                self.negative_cache.record(key, error.status or error.kind)
+        return data
+    
+    def _send_request(self, url: str, params: Dict, method: str,
+                      cancel: threading.Event = None) -> Tuple[Optional[Dict], Optional[APIError]]:
+        """One Riot request with retries; returns (data, None) or (None, APIError)"""
+        host = urlparse(url).netloc
         headers = {
-            'X-Riot-Token': self.api_key,
-            'User-Agent': 'LoL-Build-System/1.0'
+            'X-Riot-Token': self.api_key
         }
         
-        max_retries = 3
-        retry_count = 0
-        
-        while retry_count < max_retries:
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow(host):
+                return None, APIError(url, CIRCUIT_OPEN, attempts=attempt)
+            if not self.scheduler.acquire(host, method, self.priority, cancel):
+                self.circuit_breaker.release(host)
+                return None, APIError(url, CANCELLED, attempts=attempt)
+            attempt += 1
+            
+            start = time.perf_counter()
             try:
-                time.sleep(self.rate_limit_delay)
-                response = requests.get(url, headers=headers, params=params, timeout=10)
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except requests.exceptions.Timeout:
+                self.circuit_breaker.record_failure(host)
+                error = APIError(url, TIMEOUT, attempts=attempt)
+                metrics.inc('http_requests_total', api='riot', endpoint=method, status=TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                self.circuit_breaker.record_failure(host)
+                error = APIError(url, CONNECTION, message=str(e)[:100], attempts=attempt)
+                metrics.inc('http_requests_total', api='riot', endpoint=method, status=CONNECTION)
+            else:
+                metrics.observe('http_request_seconds', time.perf_counter() - start, api='riot', endpoint=method)
+                metrics.inc('http_requests_total', api='riot', endpoint=method, status=response.status_code)
+                self.rate_limiter.update(host, method, response.headers)
                 
                 if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 120))
-                    retry_count += 1
-                    
-                    if retry_count < max_retries:
-                        print(f"⏱️  Rate limited. Waiting {retry_after}s (retry {retry_count}/{max_retries})...")
-                        time.sleep(retry_after)
-                        continue
-                    else:
-                        print(f"❌ Rate limit exceeded after {max_retries} retries")
-                        return None
-                else:
-                    print(f"API Error {response.status_code}: {response.text[:100]}")
-                    return None
-                    
-            except requests.exceptions.Timeout:
-                retry_count += 1
-                if retry_count < max_retries:
-                    print(f"⏱️  Request timeout, retrying ({retry_count}/{max_retries})...")
-                    time.sleep(2)
+                    self.circuit_breaker.record_success(host)
+                    try:
+                        return response.json(), None
+                    except ValueError:
+                        return None, APIError(url, HTTP_ERROR, 200, 'invalid JSON body', attempt)
+                
+                if response.status_code == 429:
+                    # A 429 without Retry-After comes from the underlying service, not our budget
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.penalize(host, method, retry_after, response.headers.get('X-Rate-Limit-Type'))
+                    # Rate limiting says nothing about the host's health either way
+                    self.circuit_breaker.release(host)
+                    if attempt >= self.max_retries:
+                        return None, APIError(url, RATE_LIMITED, 429, attempts=attempt)
+                    # The limiter holds the next attempt back until Retry-After has passed
                     continue
-                else:
-                    print(f"❌ Request timeout after {max_retries} retries")
-                    return None
-            except KeyboardInterrupt:
-                print(f"\n⚠️  Request interrupted by user")
-                raise
-            except Exception as e:
-                print(f"Request error: {e}")
-                return None
-        
-        return None
+                
+                error = APIError(url, HTTP_ERROR, response.status_code, response.text[:100], attempt)
+                if not error.transient:
+                    # The host answered; a 404 or 403 says nothing about its health
+                    self.circuit_breaker.record_success(host)
+                    return None, error
+                self.circuit_breaker.record_failure(host)
+            
+            if attempt >= self.max_retries:
+                return None, error
+            
+            # 5xx, timeouts and dropped connections: back off with jitter before retrying
+            delay = backoff_delay(attempt - 1, self.backoff_base)
+            metrics.inc('retry_backoff_seconds_total', delay)
+            if cancel is not None:
+                if cancel.wait(delay):
+                    return None, APIError(url, CANCELLED, attempts=attempt)
+            else:
+                time.sleep(delay)
+    
+    def _league_cache_file(self, tier: str, queue: str) -> Path:
+        # EUW keeps the original file names so existing caches stay valid
+        if self.region == 'euw1':
+            return self.cache_dir / f'{tier}_{queue}.json'
+        return self.cache_dir / f'{tier}_{self.region}_{queue}.json'
     
     def get_challenger_players(self, queue: str = 'RANKED_SOLO_5x5') -> List[Dict]:
-        cache_file = self.cache_dir / f'challenger_{queue}.json'
+        cache_file = self._league_cache_file('challenger', queue)
         
         if cache_file.exists():
             mtime = cache_file.stat().st_mtime
             if time.time() - mtime < 86400:
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+                players = read_cached(cache_file)
+                if players is not None:
+                    metrics.record_cache(cache_file, True)
+                    return players
+        metrics.record_cache(cache_file, False)
         
         url = f"{self.BASE_URLS[self.region]}/lol/league/v4/challengerleagues/by-queue/{queue}"
-        data = self._make_request(url)
+        data = self._make_request(url, method='league-v4')
         
         if data and 'entries' in data:
             players = data['entries'][:50]
-            with open(cache_file, 'w') as f:
-                json.dump(players, f, indent=2)
+            write_json(cache_file, players)
             return players
         
         return []
     
     def get_master_players(self, queue: str = 'RANKED_SOLO_5x5', limit: int = 200) -> List[Dict]:
         """Get Master tier players - more populated than Challenger"""
-        cache_file = self.cache_dir / f'master_{queue}.json'
+        cache_file = self._league_cache_file('master', queue)
         
         if cache_file.exists():
             mtime = cache_file.stat().st_mtime
             if time.time() - mtime < 86400:
-                with open(cache_file, 'r') as f:
-                    cached = json.load(f)
+                cached = read_cached(cache_file)
+                if cached is not None:
+                    metrics.record_cache(cache_file, True)
                     return cached[:limit]
+        metrics.record_cache(cache_file, False)
         
         url = f"{self.BASE_URLS[self.region]}/lol/league/v4/masterleagues/by-queue/{queue}"
-        data = self._make_request(url)
+        data = self._make_request(url, method='league-v4')
         
         if data and 'entries' in data:
             # Cache ALL Master players, then slice
             players = data['entries']
-            with open(cache_file, 'w') as f:
-                json.dump(players, f, indent=2)
+            write_json(cache_file, players)
             return players[:limit]
         
         return []
@@ -159,201 +283,277 @@ class RiotAPIClient:
     
     def get_summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
         url = f"{self.BASE_URLS[self.region]}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        return self._make_request(url)
+        return self._make_request(url, method='summoner-v4')
     
-    def get_match_ids(self, puuid: str, count: int = 20) -> List[str]:
+    def get_match_ids(self, puuid: str, count: int = 20, cancel: threading.Event = None,
+                      start: int = 0, start_time: int = None) -> List[str]:
+        return self._request_match_ids(puuid, count, cancel, start, start_time) or []
+    
+    def _request_match_ids(self, puuid: str, count: int, cancel: threading.Event = None,
+                           start: int = 0, start_time: int = None) -> Optional[List[str]]:
+        """Like get_match_ids, but None when the request failed rather than found no games"""
         url = f"{self.REGIONAL_URLS[self.regional_route]}/lol/match/v5/matches/by-puuid/{puuid}/ids"
         params = {
-            'start': 0,
+            'start': start,
             'count': count,
             'queue': 420
         }
+        if start_time is not None:
+            # Epoch seconds; only games that started after this are listed
+            params['startTime'] = start_time
         
-        data = self._make_request(url, params)
-        return data if data else []
+        data = self._make_request(url, params, method='match-v5-ids', cancel=cancel)
+        return data if isinstance(data, list) else None
+    
+    def get_recent_match_ids(self, puuid: str, count: int = 20, cancel: threading.Event = None) -> List[str]:
+        """
+        The player's `count` most recent ranked match IDs, spending requests on new games only.
+
+        Known players are asked for games after their newest seen gameEndTimestamp
+        (skipped entirely if crawled within recrawl_interval); history is paged
+        backward only when fewer than `count` IDs are known.
+        """
+        index = self.match_id_index
+        entry = index.get(puuid)
+        
+        if entry is None:
+            match_ids = self.get_match_ids(puuid, count, cancel=cancel)
+            if match_ids:
+                index.add_newer(puuid, match_ids)
+            return match_ids
+        
+        if time.time() - entry['crawled_at'] >= self.recrawl_interval:
+            start_time = entry['newest_end'] // 1000 if entry['newest_end'] else None
+            newer = []
+            while True:
+                page = self._request_match_ids(puuid, 100 if start_time else count, cancel=cancel,
+                                               start=len(newer), start_time=start_time)
+                if page is None:
+                    # A failed page would leave a gap; keep the known IDs and retry on the next crawl
+                    newer = None
+                    break
+                newer.extend(page)
+                # Without a start time the first page is all we need
+                if not start_time or len(page) < 100:
+                    break
+            if newer is not None:
+                index.add_newer(puuid, newer)
+                entry = index.get(puuid)
+        
+        known = entry['ids']
+        if len(known) < count:
+            older = self.get_match_ids(puuid, count - len(known), cancel=cancel, start=len(known))
+            if older:
+                index.add_older(puuid, older)
+                known = known + older
+        
+        return known[:count]
     
-    def get_match_details(self, match_id: str) -> Optional[Dict]:
+    def get_match_details(self, match_id: str, cancel: threading.Event = None) -> Optional[Dict]:
         cache_file = self.cache_dir / f'match_{match_id}.json'
+        match_log = self.match_log
         
-        if cache_file.exists():
-            with open(cache_file, 'r') as f:
-                return json.load(f)
+        data = match_log.get(match_id) if match_log else None
+        if data is None:
+            data = read_cached(cache_file)
+        if data is not None:
+            metrics.record_cache(cache_file, True)
+            self.match_id_index.note_match_end(data)
+            return data
+        metrics.record_cache(cache_file, False)
         
         url = f"{self.REGIONAL_URLS[self.regional_route]}/lol/match/v5/matches/{match_id}"
-        data = self._make_request(url)
+        data = self._make_request(url, method='match-v5-details', cancel=cancel)
         
         if data:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            if match_log:
+                match_log.append(match_id, data)
+            else:
+                write_json(cache_file, data)
+            self.match_id_index.note_match_end(data)
+            self.build_index.add_match(match_id, data)
         
         return data
     
-    def analyze_champion_builds(self, champion_name: str, role: str = None, match_count: int = 100) -> Dict:
-        # Map common role names to Riot API teamPosition values
-        role_mapping = {
-            'top': 'TOP',
-            'jungle': 'JUNGLE',
-            'mid': 'MIDDLE',
-            'middle': 'MIDDLE',
-            'adc': 'BOTTOM',
-            'bottom': 'BOTTOM',
-            'bot': 'BOTTOM',
-            'support': 'UTILITY',
-            'utility': 'UTILITY',
-            'sup': 'UTILITY'
-        }
+    def analyze_champion_builds(self, champion_name: str, role: str = None, match_count: int = 100,
+                                offline: bool = False, converge: bool = False) -> Dict:
+        if offline:
+            return self.analyze_cached_builds(champion_name, role)
         
-        api_role = None
-        if role:
-            api_role = role_mapping.get(role.lower(), role.upper())
+        api_role = normalize_role(role)
 
         print(f"\n🔍 Analyzing {champion_name} from high-elo games...")
-        print(f"   Target: {match_count} games | Role: {role} (API: {api_role or 'Any'})")
+        print(f"   Target: {match_count} games{' (or until stable)' if converge else ''} | Role: {role} (API: {api_role or 'Any'})")
         
+        target = (champion_name, role)
+        crawl = self._crawl_builds([target], match_count, converge)
+        if crawl is None:
+            return {}
+        
+        builds, players_checked, matches_scanned = crawl
+        builds_data = builds[target]
+        
+        if builds_data['total_games'] == 0:
+            print(f"\n❌ No games found for {champion_name} ({role or 'any role'})")
+            print(f"   Scanned {matches_scanned} matches from {players_checked} Challenger/Master players")
+            print(f"   This champion might be very rare or the role incorrect")
+            return {}
+        
+        analysis = summarize_builds(builds_data, champion_name, role)
+        
+        print(f"\n✅ Analysis complete!")
+        print(f"   Games analyzed: {analysis['total_games']}")
+        print(f"   Winrate: {analysis['winrate']:.1f}%")
+        
+        return analysis
+    
+    def analyze_multiple_champions(self, champions: Iterable[Union[str, Tuple[str, Optional[str]]]],
+                                   match_count: int = 100, converge: bool = False) -> Dict[Tuple[str, Optional[str]], Dict]:
+        """
+        Analyze a whole champion pool in one crawl. Each match is checked against every
+        target, so the crawl stops once all targets reach match_count (or players run out).
+        With converge=True a target also drops out as soon as its build is stable, leaving
+        the rest of the budget to rarer champions.
+        Accepts champion names or (champion, role) pairs; results are keyed by (champion, role).
+        """
+        targets = []
+        for champion in champions:
+            target = champion if isinstance(champion, tuple) else (champion, None)
+            if target not in targets:
+                targets.append(target)
+        
+        print(f"\n🔍 Analyzing {len(targets)} champions from high-elo games in one pass...")
+        print(f"   Target: {match_count} games each{' (or until stable)' if converge else ''}")
+        
+        crawl = self._crawl_builds(targets, match_count, converge)
+        if crawl is None:
+            return {target: {} for target in targets}
+        
+        builds, players_checked, matches_scanned = crawl
+        results = {}
+        for champion_name, role in targets:
+            builds_data = builds[(champion_name, role)]
+            if builds_data['total_games'] == 0:
+                print(f"   ❌ {champion_name} ({role or 'any role'}): no games found")
+                results[(champion_name, role)] = {}
+                continue
+            analysis = summarize_builds(builds_data, champion_name, role)
+            print(f"   ✓ {champion_name} ({role or 'any role'}): {analysis['total_games']} games, {analysis['winrate']:.1f}% WR")
+            results[(champion_name, role)] = analysis
+        
+        print(f"\n✅ Analysis complete! Scanned {matches_scanned} matches from {players_checked} players")
+        return results
+    
+    def _open_pipeline(self, max_players: int = 100) -> Optional[MatchFetchPipeline]:
+        """Match stream over this region's high-elo players, or None when none could be fetched"""
         # Get a LARGE pool of high-elo players for better champion coverage
-        players = self.get_high_elo_players(limit=250)
+        with metrics.timer(phase='player_list'):
+            players = self.get_high_elo_players(limit=250)
         if not players:
+            return None
+        
+        # Fetch ID lists and match details concurrently; results arrive in completion order
+        puuids = [player.get('puuid') for player in players[:max_players]]
+        return MatchFetchPipeline(self, puuids, ids_per_player=10, max_workers=self.max_workers)
+    
+    def _crawl_builds(self, targets: List[Tuple[str, Optional[str]]], match_count: int,
+                      converge: bool = False, max_players: int = 100) -> Optional[Tuple[Dict, int, int]]:
+        """
+        Shared crawl behind the live analyses: aggregates every target from the same
+        stream of matches. Returns (builds_data per target, players checked, matches scanned),
+        or None when no players could be fetched.
+        """
+        pipeline = self._open_pipeline(max_players)
+        if pipeline is None:
             print("❌ Could not fetch high-elo players")
-            return {}
+            return None
         
-        builds_data = {
-            'items': defaultdict(int),
-            'boots': defaultdict(int),
-            'starting_items': defaultdict(int),
-            'runes': defaultdict(int),
-            'summoners': defaultdict(int),
-            'total_games': 0,
-            'wins': 0
-        }
+        builds = {target: new_builds_data() for target in targets}
+        api_roles = {target: normalize_role(target[1]) for target in targets}
+        by_champion = defaultdict(list)
+        for target in targets:
+            by_champion[target[0].lower()].append(target)
+        remaining = set(targets)
+        trackers = {target: ConvergenceTracker() for target in targets} if converge else {}
         
-        analyzed = 0
-        players_checked = 0
-        seen_matches = set()  # Track matches we've already processed
-        max_players = min(len(players), 100)  # Check up to 100 players for wide coverage
+        names = ', '.join(target[0] for target in targets)
         
         print(f"\n  🎮 Scanning High-Elo Game Pool (Challenger → Master)...")
-        print(f"     Strategy: Searching for {champion_name} in matches of {max_players} top players")
+        print(f"     Strategy: Searching for {names} in matches of {len(pipeline.puuids)} top players")
         
-        for player in players[:max_players]:
-            if analyzed >= match_count:
-                break
-            
-            players_checked += 1
-            
-            # PUUID is directly in the data
-            puuid = player.get('puuid')
-            if not puuid:
-                continue
-            
-            # Get FEWER matches per player (10) but check MORE players for distribution
-            match_ids = self.get_match_ids(puuid, 10)
-            
-            for match_id in match_ids:
-                if analyzed >= match_count:
-                    break
-                
-                # Skip if we've already analyzed this match (from another player)
-                if match_id in seen_matches:
-                    continue
-                
-                match_data = self.get_match_details(match_id)
-                if not match_data:
-                    continue
-                
-                seen_matches.add(match_id)
-                
-                # Search ALL participants for our champion
+        progress_step = 0
+        errors_before = self.error_counts.copy()
+        
+        with pipeline, metrics.timer(phase='crawl'):
+            for match_id, match_data in pipeline:
+                # Search ALL participants for any target still short of games
                 for participant in match_data['info']['participants']:
-                    if participant['championName'].lower() == champion_name.lower():
-                        # Check role if specified
-                        if api_role:
-                            participant_role = participant.get('teamPosition', '').upper()
-                            if api_role != participant_role:
-                                continue
-                        
-                        # Found a match!
-                        builds_data['total_games'] += 1
-                        if participant['win']:
-                            builds_data['wins'] += 1
-                        
-                        # Separate boots from regular items
-                        boots_ids = ['1001', '3006', '3009', '3020', '3047', '3111', '3117', '3158']
-                        all_items = [participant[f'item{i}'] for i in range(6) if participant.get(f'item{i}', 0) > 0]
-                        
-                        boots = [item for item in all_items if str(item) in boots_ids]
-                        regular_items = [item for item in all_items if str(item) not in boots_ids]
+                    for target in by_champion.get(participant['championName'].lower(), []):
+                        if target not in remaining:
+                            continue
+                        if api_roles[target] and api_roles[target] != participant.get('teamPosition', '').upper():
+                            continue
                         
-                        for item in regular_items:
-                            builds_data['items'][item] += 1
-                        
-                        for boot in boots:
-                            builds_data['boots'][boot] += 1
-                        
-                        starting = tuple(sorted(all_items[:2])) if len(all_items) >= 2 else tuple(all_items)
-                        if starting:
-                            builds_data['starting_items'][starting] += 1
-                        
-                        # Get full rune page (primary + secondary)
-                        perks = participant.get('perks', {})
-                        styles = perks.get('styles', [])
-                        
-                        if len(styles) >= 2:
-                            rune_primary = styles[0].get('style')
-                            rune_keystone = styles[0].get('selections', [{}])[0].get('perk')
-                            rune_secondary = styles[1].get('style')
-                            
-                            if rune_primary and rune_keystone and rune_secondary:
-                                builds_data['runes'][(rune_primary, rune_keystone, rune_secondary)] += 1
-                        
-                        summ_key = tuple(sorted([participant['summoner1Id'], participant['summoner2Id']]))
-                        builds_data['summoners'][summ_key] += 1
-                        
-                        analyzed += 1
+                        builds_data = builds[target]
+                        add_participant(builds_data, participant)
+                        analyzed = builds_data['total_games']
                         
                         if analyzed % 5 == 0:
-                            print(f"     ✓ {analyzed}/{match_count} games found")
-                        
-                        break  # Only count once per match
+                            prefix = f"{target[0]}: " if len(targets) > 1 else ''
+                            print(f"     ✓ {prefix}{analyzed}/{match_count} games found")
+                        if analyzed >= match_count:
+                            remaining.discard(target)
+                        elif converge and trackers[target].update(builds_data):
+                            print(f"     ✓ {target[0]}: build stable after {analyzed} games, stopping early")
+                            remaining.discard(target)
+                
+                # Stop all in-flight work as soon as every target has enough games
+                if not remaining:
+                    break
+                
+                # Progress update
+                if pipeline.players_checked // 10 > progress_step:
+                    progress_step = pipeline.players_checked // 10
+                    found = sum(builds_data['total_games'] for builds_data in builds.values())
+                    print(f"     🔍 Scanned {pipeline.matches_fetched} matches from High-Elo pool, found {found} games...")
             
-            # Progress update
-            if players_checked % 10 == 0 and analyzed < match_count:
-                print(f"     🔍 Scanned {len(seen_matches)} matches from High-Elo pool, found {analyzed} games...")
+            players_checked = pipeline.players_checked
+            matches_scanned = pipeline.matches_fetched
         
-        if builds_data['total_games'] == 0:
+        # Persist the counts of every match fetched during this crawl
+        self.build_index.flush()
+        self.match_id_index.flush()
+        self.negative_cache.flush()
+        
+        failed = self.error_counts - errors_before
+        if failed:
+            summary = ', '.join(f"{kind}: {count}" for kind, count in failed.most_common())
+            print(f"     ⚠️  {sum(failed.values())} requests failed ({summary})")
+        
+        return builds, players_checked, matches_scanned
+    
+    def analyze_cached_builds(self, champion_name: str, role: str = None, workers: int = None) -> Dict:
+        """Same aggregate as analyze_champion_builds, over every cached match and with no API calls"""
+        api_role = normalize_role(role)
+        
+        print(f"\n🔍 Analyzing {champion_name} from the local match cache...")
+        
+        # Only match files the persistent index hasn't counted yet are parsed
+        index = self.build_index
+        with metrics.timer(phase='index_refresh'):
+            added = index.refresh(workers)
+        print(f"   Corpus: {len(index.match_ids)} matches ({added} newly indexed) | Role: {role} (API: {api_role or 'Any'})")
+        
+        builds_data = index.lookup(champion_name, role)
+        if not builds_data or builds_data['total_games'] == 0:
             print(f"\n❌ No games found for {champion_name} ({role or 'any role'})")
-            print(f"   Scanned {len(seen_matches)} matches from {players_checked} Challenger/Master players")
-            print(f"   This champion might be very rare or the role incorrect")
+            print(f"   Scanned {len(index.match_ids)} cached matches")
             return {}
         
-        winrate = (builds_data['wins'] / builds_data['total_games']) * 100
-        
-        most_common_items = sorted(builds_data['items'].items(), key=lambda x: x[1], reverse=True)[:6]
-        most_common_boots = max(builds_data['boots'].items(), key=lambda x: x[1])[0] if builds_data['boots'] else None
-        most_common_start = max(builds_data['starting_items'].items(), key=lambda x: x[1])[0] if builds_data['starting_items'] else []
-        most_common_runes = max(builds_data['runes'].items(), key=lambda x: x[1])[0] if builds_data['runes'] else (None, None, None)
-        most_common_summs = max(builds_data['summoners'].items(), key=lambda x: x[1])[0] if builds_data['summoners'] else []
+        analysis = summarize_builds(builds_data, champion_name, role)
         
         print(f"\n✅ Analysis complete!")
-        print(f"   Games analyzed: {builds_data['total_games']}")
-        print(f"   Winrate: {winrate:.1f}%")
-        
-        # Safely extract runes
-        rune_primary = most_common_runes[0] if most_common_runes and len(most_common_runes) > 0 else None
-        rune_keystone = most_common_runes[1] if most_common_runes and len(most_common_runes) > 1 else None
-        rune_secondary = most_common_runes[2] if most_common_runes and len(most_common_runes) > 2 else None
-        
-        return {
-            'champion': champion_name,
-            'role': role or 'Any',
-            'total_games': builds_data['total_games'],
-            'winrate': winrate,
-            'core_items': [item[0] for item in most_common_items],
-            'boots': most_common_boots,
-            'starting_items': list(most_common_start),
-            'runes': {
-                'primary': rune_primary,
-                'keystone': rune_keystone,
-                'secondary': rune_secondary
-            },
-            'summoners': list(most_common_summs)
-        }
+        print(f"   Games analyzed: {analysis['total_games']}")
+        print(f"   Winrate: {analysis['winrate']:.1f}%")
+        
+        return analysis
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Riot API, for exercising RiotAPIClient without a key or network.
+
+Serves league-v4 (Challenger/Master) and match-v5 (match IDs by PUUID, match
+details) from the cache/ corpus, emulates Riot rate-limit headers and 429s,
+adds configurable latency and injects faults: scripted responses first, then
+random 429/5xx/slow responses at the given rates.
+
+Usage:
+    python riot_stub_server.py [--port 8089] [--latency-ms 40] [--rate-limits 20:1,100:120]
+                               [--error-rate 0.1] [--slow-rate 0.05]
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+from cache_codec import decode
+from rate_limiter import parse_rate_limits
+
+
+MATCH_PATH = re.compile(r'^/lol/match/v5/matches/([A-Za-z0-9_]+)$')
+MATCH_IDS_PATH = re.compile(r'^/lol/match/v5/matches/by-puuid/([^/]+)/ids$')
+LEAGUE_PATH = re.compile(r'^/lol/league/v4/(challenger|master)leagues/by-queue/([A-Za-z0-9_]+)$')
+
+SLOW = 'slow'
+
+
+class RiotStubServer:
+    """
+    Threaded HTTP server answering like the Riot API.
+
+    With `rate_limits` (e.g. [(20, 1), (100, 120)]) every response carries
+    X-App-Rate-Limit and X-App-Rate-Limit-Count headers, and requests over the
+    budget get a 429 with Retry-After like a real application limit. Each
+    response is delayed by `latency` seconds plus up to `latency_jitter`.
+
+    `faults` is a script consumed in order, one entry per request: an HTTP status
+    to return (429 comes with Retry-After), SLOW to stall for `slow_seconds`
+    before answering normally, or 200 to answer normally. Once it is used up,
+    each request fails with a status from `error_statuses` at `error_rate` and
+    stalls at `slow_rate`.
+    """
+
+    def __init__(self, cache_dir: str = 'cache', port: int = 0, faults: Iterable[Union[int, str]] = None,
+                 error_rate: float = 0.0, error_statuses: Tuple[int, ...] = (500, 503),
+                 slow_rate: float = 0.0, slow_seconds: float = 2.0, retry_after: Union[int, float, str] = 1,
+                 seed: Optional[int] = None, rate_limits: List[Tuple[int, int]] = None,
+                 latency: float = 0.0, latency_jitter: float = 0.0):
+        self.cache_dir = Path(cache_dir)
+        self.rate_limits = rate_limits or []
+        self.sent: Dict[int, deque] = {window: deque() for _, window in self.rate_limits}
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self._player_matches: Optional[Dict[str, List[Tuple[int, str]]]] = None
+        self.faults = deque(faults or [])
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.status_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def start(self) -> 'RiotStubServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='riot-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def point_client(self, client):
+        """Send every platform and regional route of a RiotAPIClient to this server"""
+        client.BASE_URLS = {region: self.url for region in type(client).BASE_URLS}
+        client.REGIONAL_URLS = {route: self.url for route in type(client).REGIONAL_URLS}
+
+    def next_fault(self) -> Union[int, str]:
+        with self._lock:
+            self.requests += 1
+            if self.faults:
+                return self.faults.popleft()
+            roll = self.random.random()
+            if roll < self.error_rate:
+                return self.random.choice(self.error_statuses)
+            if roll < self.error_rate + self.slow_rate:
+                return SLOW
+            return 200
+
+    def check_rate_limit(self) -> Tuple[Optional[int], Dict[str, str]]:
+        """Count one request against the emulated app limit: (Retry-After or None, headers)"""
+        if not self.rate_limits:
+            return None, {}
+
+        with self._lock:
+            now = time.monotonic()
+            retry_after = None
+            for count, window in self.rate_limits:
+                sent = self.sent[window]
+                while sent and sent[0] <= now - window:
+                    sent.popleft()
+                if len(sent) >= count:
+                    wait = sent[len(sent) - count] + window - now
+                    retry_after = max(retry_after or 0, math.ceil(wait))
+
+            if retry_after is None:
+                for sent in self.sent.values():
+                    sent.append(now)
+
+            headers = {
+                'X-App-Rate-Limit': ','.join(f"{count}:{window}" for count, window in self.rate_limits),
+                'X-App-Rate-Limit-Count': ','.join(f"{len(self.sent[window])}:{window}"
+                                                   for _, window in self.rate_limits)
+            }
+            return retry_after, headers
+
+    def player_matches(self) -> Dict[str, List[Tuple[int, str]]]:
+        """(gameStartTimestamp, match ID) per PUUID over the cached corpus, newest first"""
+        with self._lock:
+            if self._player_matches is None:
+                by_player = defaultdict(list)
+                for path in self.cache_dir.glob('match_*.json'):
+                    try:
+                        # decode() rather than read_json(): the stand-in's reads are not the client's
+                        match_data = decode(path.read_bytes())
+                    except (OSError, ValueError):
+                        continue
+                    started = match_data['info'].get('gameStartTimestamp') or 0
+                    for puuid in match_data['metadata'].get('participants', []):
+                        by_player[puuid].append((started, match_data['metadata']['matchId']))
+                for matches in by_player.values():
+                    matches.sort(reverse=True)
+                self._player_matches = dict(by_player)
+            return self._player_matches
+
+    def route(self, path: str) -> Tuple[int, Optional[object]]:
+        """Status and JSON body for a request path"""
+        parsed = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        match = MATCH_PATH.match(parsed.path)
+        if match:
+            cache_file = self.cache_dir / f'match_{match.group(1)}.json'
+            if cache_file.exists():
+                return 200, decode(cache_file.read_bytes())
+
+        match = MATCH_IDS_PATH.match(parsed.path)
+        if match:
+            matches = self.player_matches().get(match.group(1), [])
+            if 'startTime' in query:
+                start_time = int(query['startTime']) * 1000
+                matches = [entry for entry in matches if entry[0] >= start_time]
+            start = int(query.get('start', 0))
+            count = int(query.get('count', 20))
+            return 200, [match_id for _, match_id in matches[start:start + count]]
+
+        match = LEAGUE_PATH.match(parsed.path)
+        if match:
+            tier, queue = match.groups()
+            cache_file = self.cache_dir / f'{tier}_{queue}.json'
+            if cache_file.exists():
+                return 200, {'tier': tier.upper(), 'queue': queue, 'entries': decode(cache_file.read_bytes())}
+
+        return 404, {'status': {'message': 'Data not found', 'status_code': 404}}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if server.latency or server.latency_jitter:
+                    time.sleep(server.latency + server.random.uniform(0, server.latency_jitter))
+
+                retry_after, headers = server.check_rate_limit()
+                if retry_after is not None:
+                    headers.update({'Retry-After': str(retry_after), 'X-Rate-Limit-Type': 'application'})
+                    with server._lock:
+                        server.requests += 1
+                        server.status_counts[429] += 1
+                    self._send(429, {'status': {'message': 'Rate limit exceeded', 'status_code': 429}}, headers)
+                    return
+
+                fault = server.next_fault()
+                if fault == SLOW:
+                    time.sleep(server.slow_seconds)
+                    fault = 200
+
+                if fault == 200:
+                    status, body = server.route(self.path)
+                else:
+                    status, body = fault, {'status': {'message': 'Injected fault', 'status_code': fault}}
+                    if fault == 429:
+                        headers['Retry-After'] = str(server.retry_after)
+                        headers['X-Rate-Limit-Type'] = 'service'
+
+                with server._lock:
+                    server.status_counts[status] += 1
+                self._send(status, body, headers)
+
+            def _send(self, status: int, body, headers):
+                raw = json.dumps(body).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json;charset=utf-8')
+                    self.send_header('Content-Length', str(len(raw)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout) while we were stalling
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Riot API stand-in')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--cache-dir', default='cache')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--rate-limits', default='', help="app limits like '20:1,100:120' (default: none)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = RiotStubServer(args.cache_dir, args.port, error_rate=args.error_rate,
+                            slow_rate=args.slow_rate, slow_seconds=args.slow_seconds,
+                            rate_limits=parse_rate_limits(args.rate_limits),
+                            latency=args.latency_ms / 1000, latency_jitter=args.jitter_ms / 1000)
+    print(f"🧪 Riot API stand-in listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n✅ Served {server.requests} requests: {dict(server.status_counts)}")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import pickle
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from cache_codec import atomic_write
+from metrics import metrics
+
+
+# Bump when the snapshot layout or BuildGenerator._process_items output changes
+SNAPSHOT_FORMAT = 1
+
+
+def snapshot_path(cache_dir: Union[str, Path], version: str) -> Path:
+    return Path(cache_dir) / f"static_{version}.pickle"
+
+
+def load_snapshot(cache_dir: Union[str, Path], version: str) -> Optional[Dict]:
+    """
+    Static data snapshot for a patch: raw items/runes/champions plus the
+    processed items table. None if missing, stale or unreadable.
+    """
+    path = snapshot_path(cache_dir, version)
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        metrics.record_cache(path, False)
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT \
+            or snapshot.get('version') != version:
+        metrics.record_cache(path, False)
+        return None
+
+    metrics.record_cache(path, True)
+    return snapshot
+
+
+def save_snapshot(cache_dir: Union[str, Path], snapshot: Dict):
+    """Write the snapshot for snapshot['version'] and drop the ones of older patches"""
+    cache_dir = Path(cache_dir)
+    path = snapshot_path(cache_dir, snapshot['version'])
+    snapshot = dict(snapshot, format=SNAPSHOT_FORMAT)
+
+    atomic_write(path, pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+
+    for old in cache_dir.glob('static_*.pickle'):
+        if old != path:
+            try:
+                old.unlink()
+            except OSError:
+                pass
@@ -2,6 +2,7 @@
 """
 Test script for the improved error handling in API calls.
 Tests:
+0. Retries, backoff and circuit breaking against a local fault-injecting stub (no key needed)
 1. Rate limit retry logic (429 responses)
 2. Empty result detection
 3. Clear user feedback messages
@@ -10,12 +11,114 @@ Tests:
 
 import os
 import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
 from build_generator import BuildGenerator
+from circuit_breaker import CircuitBreaker
+from request_cache import SingleFlight
+from riot_api_client import RiotAPIClient
+from riot_stub_server import RiotStubServer, SLOW
 
 print("=" * 60)
 print("🧪 TESTING IMPROVED ERROR HANDLING")
 print("=" * 60)
 
+print("\n" + "=" * 60)
+print("TEST 0: Fault injection against the local stub server")
+print("=" * 60)
+
+
+def stub_client(server, cache_dir, breaker=None):
+    client = RiotAPIClient(api_key='RGAPI-stub', cache_dir=cache_dir, in_flight=SingleFlight(),
+                           circuit_breaker=breaker or CircuitBreaker())
+    server.point_client(client)
+    client.timeout = 0.5
+    client.backoff_base = 0.05
+    return client
+
+
+def check(label, ok, detail=''):
+    print(f"   {'✅' if ok else '❌'} {label}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+match_ids = [name[len('match_'):-len('.json')] for name in sorted(os.listdir('cache'))
+             if name.startswith('match_')][:4] if os.path.isdir('cache') else []
+stub_results = []
+
+if len(match_ids) < 4:
+    print("\n⚠️  Needs 4 cached match files in cache/, skipping")
+else:
+    with tempfile.TemporaryDirectory() as tmp:
+        # 5xx twice, then the real answer: retried with backoff, no error left behind
+        with RiotStubServer(faults=[503, 502]) as server:
+            client = stub_client(server, tmp)
+            data = client.get_match_details(match_ids[0])
+            stub_results.append(check("503, 502 then 200 is retried", data is not None and server.requests == 3,
+                                      f"{server.requests} requests"))
+
+        # A stalled response times out and is retried
+        with RiotStubServer(faults=[SLOW], slow_seconds=1.0) as server:
+            client = stub_client(server, tmp)
+            data = client.get_match_details(match_ids[1])
+            stub_results.append(check("Timeout is retried", data is not None and server.requests == 2,
+                                      f"{server.requests} requests"))
+
+        # A 404 is final: one request, a structured error, nothing printed
+        with RiotStubServer(faults=[404]) as server:
+            client = stub_client(server, tmp)
+            data = client.get_match_details('EUW1_0')
+            error = client.errors[-1] if client.errors else None
+            stub_results.append(check("404 is not retried and returned as APIError",
+                                      data is None and server.requests == 1 and error is not None
+                                      and error.status == 404, str(error)))
+
+        # 429 honours Retry-After through the rate limiter
+        with RiotStubServer(faults=[429], retry_after=1) as server:
+            client = stub_client(server, tmp)
+            data = client.get_match_details(match_ids[2])
+            stub_results.append(check("429 waits for Retry-After, then succeeds",
+                                      data is not None and server.requests == 2))
+
+        # Retry-After as fractional seconds or an HTTP-date is parsed, not raised
+        with RiotStubServer(faults=[429, 429], retry_after='0.5') as server:
+            client = stub_client(server, tmp)
+            client.get_match_details('EUW1_5')
+            stub_results.append(check("Non-integer Retry-After is honoured", server.requests == 3,
+                                      f"{server.requests} requests"))
+
+        # Persistent 503s open the circuit: later requests fail fast without reaching the server
+        with RiotStubServer(error_rate=1.0, error_statuses=(503,)) as server:
+            client = stub_client(server, tmp, CircuitBreaker(failure_threshold=3, reset_timeout=30))
+            client.get_match_details('EUW1_1')
+            sent = server.requests
+            client.get_match_details('EUW1_2')
+            error = client.errors[-1] if client.errors else None
+            stub_results.append(check("Circuit opens after repeated 5xx and fails fast",
+                                      sent == 3 and server.requests == sent and error is not None
+                                      and error.kind == 'circuit_open', str(error)))
+
+        # A half-open trial that is cancelled or rate limited hands its slot back instead of wedging the circuit
+        with RiotStubServer(faults=[503, 429], retry_after=1) as server:
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+            client = stub_client(server, tmp, breaker)
+            client.get_match_details('EUW1_3')
+            time.sleep(0.3)
+            cancel = threading.Event()
+            cancel.set()
+            client.get_match_details('EUW1_4', cancel=cancel)
+            cancelled_released = not any(breaker.trial_running.values())
+            time.sleep(0.3)
+            data = client.get_match_details(match_ids[3])
+            stub_results.append(check("Cancelled or 429'd half-open trial does not keep the circuit open",
+                                      cancelled_released and data is not None
+                                      and breaker.state(urlparse(server.url).netloc) == CircuitBreaker.CLOSED,
+                                      f"{server.requests} requests"))
+
+    print(f"\n   {sum(stub_results)}/{len(stub_results)} stub checks passed")
+
 # Check if API key exists
 if not os.path.exists('riot_api_key.txt'):
     print("\n⚠️  No riot_api_key.txt found")